@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third-party
     "crispy_forms",
     "crispy_bootstrap5",
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 # Middleware
 # ---------------------------
 MIDDLEWARE = [
+    # Outermost so it times the whole stack; removes itself unless REQUEST_METRICS_ENABLED
+    "projects.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -54,6 +57,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "projects.middleware.RoleBasedAccessMiddleware",
+    # Removes itself unless read replicas are configured
+    "projects.middleware.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -69,6 +74,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "django.template.context_processors.debug",
+                "projects.context_processors.live_updates",
             ],
         },
     },
@@ -100,6 +106,27 @@ else:
         }
     }
 
+# Read replicas, as aliases replica_1, replica_2, ... Views marked
+# read_from_replica send their reads there; everything else uses "default".
+# Locally, SQLITE_REPLICAS=db.replica.sqlite3 (a copy of db.sqlite3) stands in.
+if "SQLITE_REPLICAS" in os.environ and DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    _replica_overrides = [{"NAME": name} for name in os.environ["SQLITE_REPLICAS"].split(",") if name]
+else:
+    _replica_overrides = [{"HOST": host} for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host]
+for _number, _override in enumerate(_replica_overrides, 1):
+    # Tests run against the primary only
+    DATABASES[f"replica_{_number}"] = {**DATABASES["default"], **_override, "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["projects.routers.ReplicaRouter"]
+# WorkLog and ProjectDailyStats have covering indexes (Index(include=...)).
+# SQLite builds them without the INCLUDE columns, which is harmless for local
+# work and tests, so only there is the "not supported" warning silenced.
+if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    SILENCED_SYSTEM_CHECKS = ["models.W040"]
+# After a POST (or other write) the user's reads stay on the primary this long,
+# so replication lag never hides their own changes
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "15"))
+
 # ---------------------------
 # Password validation
 # ---------------------------
@@ -111,9 +138,98 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 # ---------------------------
-# Email backend (console for now)
+# Email backend (console unless EMAIL_BACKEND is set)
+# ---------------------------
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+
+# Outbox worker (python manage.py send_outbox)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "1"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_BACKOFF = int(os.getenv("OUTBOX_RETRY_BACKOFF", "60"))  # seconds, doubled per attempt
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+# Client feedback links stop working after this many days (python manage.py purge_feedback_tokens)
+FEEDBACK_TOKEN_TTL_DAYS = int(os.getenv("FEEDBACK_TOKEN_TTL_DAYS", "30"))
+
+# ---------------------------
+# Caches
+# ---------------------------
+# Rendered HTML fragments are keyed by project version, so a long TTL is safe
+FRAGMENT_CACHE_TTL = int(os.getenv("FRAGMENT_CACHE_TTL", "86400"))
+
+# The "dashboard" cache holds computed project dashboard figures; it is
+# in-process unless DASHBOARD_CACHE_DIR points it at a shared directory.
+DASHBOARD_CACHE_DIR = os.getenv("DASHBOARD_CACHE_DIR")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # Room for rendered kanban cards and project list rows (see projects.cache)
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000"))},
+    },
+    "dashboard": {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if DASHBOARD_CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": DASHBOARD_CACHE_DIR or "dashboard",
+        "TIMEOUT": int(os.getenv("DASHBOARD_CACHE_TTL", "600")),  # seconds
+        # Once full, both backends cull 1/CULL_FREQUENCY of the entries
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "1000")),
+            "CULL_FREQUENCY": 3,
+        },
+    },
+}
+
+# Async views run independent dashboard queries on separate connections at once.
+# Each worker thread opens its own connection (CONN_MAX_AGE is 0, so one per query),
+# which costs more than it saves on small projects; compare with
+# "manage.py benchmark_dashboard_queries" against the production database first
+PARALLEL_QUERIES = os.getenv("PARALLEL_QUERIES", "False").lower() in ("true", "1", "yes")
+
+# ---------------------------
+# Live updates
 # ---------------------------
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# Server-sent events need an ASGI server: under WSGI (gunicorn's default
+# workers) an endless stream never flushes and pins the worker. Turn this on
+# only when serving config.asgi:application, e.g. with uvicorn.
+LIVE_UPDATES_ENABLED = os.getenv("LIVE_UPDATES_ENABLED", "False").lower() in ("true", "1", "yes")
+# Pub/sub behind the server-sent-events stream. The default is in-process, so
+# every ASGI worker only sees its own writes; point this at a shared backend
+# (same publish/subscribe interface) when running several workers.
+PROJECT_EVENTS_BACKEND = os.getenv("PROJECT_EVENTS_BACKEND", "projects.events.InProcessBroker")
+# Seconds between keep-alive comments on idle event streams
+PROJECT_EVENTS_HEARTBEAT = int(os.getenv("PROJECT_EVENTS_HEARTBEAT", "15"))
+
+# ---------------------------
+# Instrumentation and logging
+# ---------------------------
+# Per-view latency/query histograms, scraped from /projects/metrics/
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "False").lower() in ("true", "1", "yes")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        # Keeps LOG_SAMPLE_RATE of the per-request DEBUG tracing; INFO and above always pass
+        "sampled": {
+            "()": "projects.log_filters.SampleFilter",
+            "rate": float(os.getenv("LOG_SAMPLE_RATE", "0.1")),
+        },
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "filters": ["sampled"]},
+    },
+    "loggers": {
+        "projects": {
+            "handlers": ["console"],
+            "level": os.getenv("PROJECTS_LOG_LEVEL", "WARNING"),
+        },
+    },
+}
 
 # ---------------------------
 # Internationalization
@@ -152,6 +268,20 @@ AUTH_USER_MODEL = "users.User"
 # ---------------------------
 # Authentication
 # ---------------------------
+# Same as ModelBackend, but the session's user comes from the default cache,
+# invalidated when the user is saved. ModelBackend stays listed because
+# sessions record the backend that logged them in, and older ones name it.
+AUTHENTICATION_BACKENDS = [
+    "users.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+# The default cache is per process, so other processes see a role change or
+# deactivation up to USER_CACHE_TTL late; only raise it with a shared cache
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "5"))  # seconds
+# "django.contrib.sessions.backends.cached_db" also saves the session query, but
+# only once the default cache is shared between processes (logouts must reach all)
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.db")
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "projects:list"
 LOGOUT_REDIRECT_URL = "login"
@@ -1,5 +1,6 @@
-from django.contrib import admin
-from .models import Project
+from django.contrib import admin, messages
+from .campaigns import run_feedback_campaign
+from .models import EmailOutbox, Project
 
 
 @admin.register(Project)
@@ -9,9 +10,29 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ('name', 'company', 'description', 'user__username')
     date_hierarchy = 'created_at'
     readonly_fields = ('created_at',)  # removed updated_at
+    actions = ['send_feedback_requests']
 
     def get_readonly_fields(self, request, obj=None):
         if obj and obj.is_submitted:  # If project exists and is submitted
             return [field.name for field in obj._meta.fields]  # Make all fields readonly
         return self.readonly_fields
 
+    @admin.action(description='Send feedback requests to clients of selected submitted projects')
+    def send_feedback_requests(self, request, queryset):
+        progress = {}
+        for progress in run_feedback_campaign(queryset, request):
+            pass
+        self.message_user(
+            request,
+            f"Feedback requests queued: {progress['queued']} of {progress['total']}.",
+            messages.SUCCESS,
+        )
+
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
@@ -0,0 +1,150 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+
+from .cache import acached_project_stats
+from .conditional import project_condition
+from .models import Project, WorkLog
+from .pagination import keyset_page
+from .routers import read_from_replica
+from .views import ProjectFilter
+
+# Public field name -> ORM path, per resource
+PROJECT_API_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'category': 'category',
+    'company': 'company',
+    'location': 'location',
+    'description': 'description',
+    'owner': 'user__username',
+    'tender_award_date': 'tender_award_date',
+    'completion_date': 'completion_date',
+    'is_submitted': 'is_submitted',
+    'submission_date': 'submission_date',
+    'client_confirmed_completed': 'client_confirmed_completed',
+    'created_at': 'created_at',
+}
+
+WORK_LOG_API_FIELDS = {
+    'id': 'id',
+    'project_id': 'project_id',
+    'username': 'user__username',
+    'date': 'date',
+    'hours_worked': 'hours_worked',
+    'description': 'description',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+
+def visible_projects(user):
+    """Same scoping as ProjectListView: directors see everything, employees their own projects."""
+    if user.is_director():
+        return Project.objects.all()
+    return Project.objects.filter(user=user)
+
+
+@method_decorator(read_from_replica, name='dispatch')
+class APIView(View):
+    """
+    Base for the async JSON endpoints: login required (403 otherwise), GET only,
+    read from a replica when one is configured.
+
+    Handlers are coroutines; ORM work that has no async form (filtersets,
+    keyset pagination) runs through sync_to_async.
+    """
+    http_method_names = ['get', 'head', 'options']
+    page_size = 50
+    max_page_size = 500
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.user = await request.auser()
+        if not self.user.is_authenticated:
+            raise PermissionDenied
+        return await super().dispatch(request, *args, **kwargs)
+
+    def error(self, message, status=400):
+        return JsonResponse({'status': 'error', 'message': message}, status=status)
+
+    def get_fields(self, available):
+        """Parse ?fields=a,b into an ordered list, or None if it names an unknown field."""
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(available)
+        fields = [name.strip() for name in requested.split(',') if name.strip()]
+        if not fields or any(name not in available for name in fields):
+            return None
+        return fields
+
+    def select(self, queryset, available, fields, extra=()):
+        """values() with only the requested columns, aliasing paths that differ from the public name."""
+        plain, aliased = [], {}
+        for name in list(fields) + [name for name in extra if name not in fields]:
+            path = available[name]
+            if name == path:
+                plain.append(name)
+            else:
+                aliased[name] = F(path)
+        return queryset.values(*plain, **aliased)
+
+    def get_page_size(self):
+        try:
+            return min(max(int(self.request.GET.get('page_size', self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            return self.page_size
+
+    async def paginate(self, queryset, available, fields):
+        """Cursor page of ``values()`` rows; id and created_at are always read for the cursor."""
+        rows, next_cursor = await sync_to_async(keyset_page)(
+            self.select(queryset, available, fields, extra=('id', 'created_at')),
+            self.request.GET.get('cursor'),
+            self.get_page_size(),
+        )
+        results = [{name: row[name] for name in fields} for row in rows]
+        return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
+
+class ProjectListAPIView(APIView):
+    async def get(self, request):
+        fields = self.get_fields(PROJECT_API_FIELDS)
+        if fields is None:
+            return self.error(f"fields must be a subset of: {', '.join(PROJECT_API_FIELDS)}")
+        # Validating the filter form can query (the user filter), so it runs in a worker thread
+        queryset = await sync_to_async(lambda: ProjectFilter(request.GET, queryset=visible_projects(self.user)).qs)()
+        return await self.paginate(queryset, PROJECT_API_FIELDS, fields)
+
+
+@method_decorator(project_condition, name='get')
+class ProjectDetailAPIView(APIView):
+    async def get(self, request, pk):
+        fields = self.get_fields(PROJECT_API_FIELDS)
+        if fields is None:
+            return self.error(f"fields must be a subset of: {', '.join(PROJECT_API_FIELDS)}")
+        project = await self.select(visible_projects(self.user), PROJECT_API_FIELDS, fields).filter(pk=pk).afirst()
+        if project is None:
+            raise Http404
+        return JsonResponse(project)
+
+
+@method_decorator(project_condition, name='get')
+class WorkLogListAPIView(APIView):
+    async def get(self, request, pk):
+        fields = self.get_fields(WORK_LOG_API_FIELDS)
+        if fields is None:
+            return self.error(f"fields must be a subset of: {', '.join(WORK_LOG_API_FIELDS)}")
+        if not await visible_projects(self.user).filter(pk=pk).aexists():
+            raise Http404
+        return await self.paginate(WorkLog.objects.filter(project_id=pk), WORK_LOG_API_FIELDS, fields)
+
+
+@method_decorator(project_condition, name='get')
+class ProjectStatsAPIView(APIView):
+    async def get(self, request, pk):
+        project = await visible_projects(self.user).only('id', 'completion_date', 'version').filter(pk=pk).afirst()
+        if project is None:
+            raise Http404
+        return JsonResponse({'project': project.pk, **await acached_project_stats(project)})
@@ -0,0 +1,108 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .stats import aget_project_stats, get_project_stats
+
+DASHBOARD_CACHE = 'dashboard'
+
+_counter_lock = threading.Lock()
+counters = Counter()
+
+
+def record(event):
+    with _counter_lock:
+        counters[event] += 1
+
+
+def dashboard_key(project_id):
+    return f'project-dashboard:{project_id}'
+
+
+def cached_project_stats(project):
+    """
+    get_project_stats() through the dashboard cache.
+
+    Entries are stored per project and tagged with the project version and the
+    day they were computed (days-left changes at midnight), so a stale entry
+    is never served even if an invalidation was missed. Hits and misses are
+    counted in ``counters``.
+    """
+    cache = caches[DASHBOARD_CACHE]
+    key = dashboard_key(project.pk)
+    tag = (project.version, timezone.localdate())
+    entry = cache.get(key)
+    if entry is not None and entry[0] == tag:
+        record('dashboard_hit')
+        return entry[1]
+
+    record('dashboard_miss')
+    payload = get_project_stats(project)
+    cache.set(key, (tag, payload))
+    return payload
+
+
+async def acached_project_stats(project):
+    """Async cached_project_stats(); a miss computes the figures with aget_project_stats()."""
+    cache = caches[DASHBOARD_CACHE]
+    key = dashboard_key(project.pk)
+    tag = (project.version, timezone.localdate())
+    entry = await cache.aget(key)
+    if entry is not None and entry[0] == tag:
+        record('dashboard_hit')
+        return entry[1]
+
+    record('dashboard_miss')
+    payload = await aget_project_stats(project)
+    await cache.aset(key, (tag, payload))
+    return payload
+
+
+def invalidate_project_stats(*project_ids):
+    caches[DASHBOARD_CACHE].delete_many([dashboard_key(project_id) for project_id in project_ids])
+
+
+def fragment_key(template_name, project, user):
+    # Owners see extra buttons, so their fragments are cached separately from everyone else's
+    owner = int(user.pk == project.user_id)
+    stamp = f'{project.version}-{project.changed_at.timestamp()}'
+    return f'fragment:{template_name}:{project.pk}:{stamp}:{owner}'
+
+
+def attach_fragments(projects, template_name, user):
+    """
+    Render ``template_name`` for each project, reusing cached HTML where possible.
+
+    The whole page of projects is looked up with one ``get_many`` and only the
+    misses are rendered (and stored with one ``set_many``). Keys include the
+    project version, so edited projects simply miss. The HTML is set as
+    ``project.fragment_html``; templates are rendered with just ``project``
+    and ``user`` in their context.
+    """
+    projects = list(projects)
+    cache = caches['default']
+    keys = {project.pk: fragment_key(template_name, project, user) for project in projects}
+    cached = cache.get_many(keys.values())
+    template = None
+    rendered = {}
+    for project in projects:
+        html = cached.get(keys[project.pk])
+        if html is None:
+            template = template or get_template(template_name)
+            html = rendered[keys[project.pk]] = template.render({'project': project, 'user': user})
+        project.fragment_html = mark_safe(html)
+    record_fragments(len(projects) - len(rendered), len(rendered))
+    if rendered:
+        cache.set_many(rendered, timeout=settings.FRAGMENT_CACHE_TTL)
+    return projects
+
+
+def record_fragments(hits, misses):
+    with _counter_lock:
+        counters['fragment_hit'] += hits
+        counters['fragment_miss'] += misses
@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import FeedbackToken
+from .outbox import queue_emails
+
+
+def eligible_projects(queryset):
+    """
+    Submitted projects that have a client email to contact.
+
+    Projects whose client still holds a usable token are left out, so running
+    a campaign twice does not mail the same client again.
+    """
+    outstanding = FeedbackToken.objects.filter(project=OuterRef('pk'), used=False, expires_at__gt=timezone.now())
+    return (
+        queryset.filter(is_submitted=True, client_email__isnull=False)
+        .exclude(client_email='')
+        .filter(~Exists(outstanding))
+    )
+
+
+def run_feedback_campaign(queryset, request, chunk_size=100):
+    """
+    Create one feedback token per eligible project and queue the client emails.
+
+    Each chunk's tokens and outbox rows are inserted with one bulk_create
+    apiece, in one transaction, and the send_outbox worker delivers them; the
+    templates are loaded once and reused. Yields a progress dict after each chunk.
+    """
+    projects = list(eligible_projects(queryset).only('id', 'name', 'company', 'location', 'client_email'))
+    subject_template = get_template('projects/emails/feedback_request_subject.txt')
+    body_template = get_template('projects/emails/feedback_request.txt')
+
+    progress = {'total': len(projects), 'queued': 0}
+    if not projects:
+        yield dict(progress)
+        return
+
+    for start in range(0, len(projects), chunk_size):
+        with transaction.atomic():
+            tokens = FeedbackToken.objects.bulk_create(
+                [FeedbackToken(project=project) for project in projects[start:start + chunk_size]]
+            )
+            messages = []
+            for token in tokens:
+                context = {
+                    'project': token.project,
+                    'feedback_url': request.build_absolute_uri(
+                        reverse('projects:client_feedback_token', args=[str(token.token)])
+                    ),
+                }
+                messages.append((
+                    subject_template.render(context).strip(),
+                    body_template.render(context),
+                    token.project.client_email,
+                ))
+            queue_emails(messages)
+        progress['queued'] += len(messages)
+        yield dict(progress)
+
+
+def purge_feedback_tokens(chunk_size=1000):
+    """
+    Delete used and expired feedback tokens, ``chunk_size`` rows per statement.
+
+    Each chunk is its own short delete found through the ``expires_at`` index,
+    so a large backlog never holds one long lock on the table. Returns the
+    number of tokens deleted.
+    """
+    cutoff = timezone.now()
+    stale = FeedbackToken.objects.filter(expires_at__lt=cutoff)
+    deleted = 0
+    while True:
+        ids = list(stale.values_list('pk', flat=True)[:chunk_size])
+        if ids:
+            deleted += FeedbackToken.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < chunk_size:
+            return deleted
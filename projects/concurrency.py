@@ -0,0 +1,39 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+
+def _in_transaction():
+    return connection.in_atomic_block
+
+
+def _on_own_connection(func):
+    def run():
+        try:
+            return func()
+        finally:
+            # Worker threads keep their connection only as long as CONN_MAX_AGE allows
+            close_old_connections()
+
+    return run
+
+
+async def gather_queries(*funcs):
+    """
+    Run independent read-only ORM callables concurrently; results come back in order.
+
+    Django's async ORM sends every query through one shared thread, so
+    ``asyncio.gather`` over plain ``a*`` calls would still run them one after
+    another. Here each callable gets its own worker thread, and so its own
+    database connection, and the queries overlap on the server. Inside a
+    transaction (including TestCase) other connections cannot see its
+    uncommitted rows, so the callables then run in turn on the request's
+    connection. PARALLEL_QUERIES=False always does that.
+    """
+    if not settings.PARALLEL_QUERIES or await sync_to_async(_in_transaction)():
+        return await sync_to_async(lambda: [func() for func in funcs])()
+    return list(await asyncio.gather(
+        *(sync_to_async(_on_own_connection(func), thread_sensitive=False)() for func in funcs)
+    ))
@@ -0,0 +1,84 @@
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import Project
+
+
+def project_state(request, pk):
+    """
+    ``(version, changed_at)`` of a project the user may see, or None.
+
+    One primary-key lookup that also reads the owner, so a 304 can be answered
+    without loading the project or running the view's permission check. The
+    result is memoised on the request because ``condition`` asks for the ETag
+    and Last-Modified separately.
+    """
+    cache = request.__dict__.setdefault('_project_state', {})
+    if pk not in cache:
+        cache[pk] = None
+        user = request.user
+        # Pending flash messages would be lost behind a 304, so render those responses normally
+        if user.is_authenticated and not len(messages.get_messages(request)):
+            row = Project.objects.filter(pk=pk).values_list('user_id', 'version', 'changed_at').first()
+            if row and (user.is_director() or row[0] == user.pk):
+                cache[pk] = row[1:]
+    return cache[pk]
+
+
+def _project_pk(kwargs):
+    return kwargs.get('pk', kwargs.get('project_id'))
+
+
+def project_etag(request, *args, **kwargs):
+    state = project_state(request, _project_pk(kwargs))
+    if state is None:
+        return None
+    # Pages differ per user and query string, and days-left figures change at midnight.
+    # Forms embed the CSRF token, which changes on every login (the session key
+    # does too), so a new login must not get a 304 for a page with the old token.
+    # get_token() creates the secret now if the page is about to, so the first
+    # response's ETag already matches the cookie it sets.
+    get_token(request)
+    key = ':'.join(str(part) for part in (
+        state[0], request.user.pk, timezone.localdate(), request.get_full_path(),
+        request.session.session_key, request.META['CSRF_COOKIE'],
+    ))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def project_last_modified(request, *args, **kwargs):
+    state = project_state(request, _project_pk(kwargs))
+    if state is None:
+        return None
+    start_of_today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(state[1], start_of_today)
+
+
+_project_condition = condition(etag_func=project_etag, last_modified_func=project_last_modified)
+
+
+def project_condition(view):
+    """
+    ETag/Last-Modified handling for views of one project (``pk`` or ``project_id`` kwarg).
+
+    Django's ``condition`` calls the validators synchronously, so for async
+    views the project lookup (and the user it needs) is done first in a
+    worker thread; the validators then read the memoised result.
+    """
+    conditional_view = _project_condition(view)
+    if not iscoroutinefunction(view):
+        return conditional_view
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        await sync_to_async(project_state)(request, _project_pk(kwargs))
+        return await conditional_view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def live_updates(request):
+    """Whether pages should open the server-sent-events stream (ASGI deployments only)."""
+    return {'live_updates': settings.LIVE_UPDATES_ENABLED}
@@ -0,0 +1,189 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# ``owner_id`` is the owning user of the project the event is about; the
+# stream uses it to decide who may see the event.
+Event = namedtuple('Event', 'id type project_id owner_id data')
+
+# Sent to a subscriber that fell too far behind; the client should reload
+RESYNC = 'resync'
+
+
+class BaseBroker:
+    """
+    Interface for the pub/sub behind the event stream.
+
+    ``publish`` is called from ordinary (sync) request code after a commit;
+    ``subscribe`` is called from the event loop and returns an object with
+    ``async get(timeout)`` (raising the builtin TimeoutError, not
+    ``asyncio.TimeoutError``, when idle) and ``close()``.
+    """
+
+    def has_subscribers(self):
+        """False only when publishing is known to reach nobody, so the payload can be skipped."""
+        return True
+
+    def publish(self, type, project_id, owner_id, data):
+        raise NotImplementedError
+
+    def subscribe(self):
+        raise NotImplementedError
+
+
+class Subscription:
+    def __init__(self, broker, maxsize):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Runs on the subscriber's own loop; a slow client loses events rather
+        # than growing memory, and is told to resync on its next read
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return Event(None, RESYNC, None, None, {})
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            # A separate class before Python 3.11; the stream catches the builtin
+            raise TimeoutError from None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(BaseBroker):
+    """Fan events out to the streams open in this process."""
+
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, type, project_id, owner_id, data):
+        event = Event(next(self._ids), type, project_id, owner_id, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's event loop has shut down
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self):
+        subscription = Subscription(self, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.PROJECT_EVENTS_BACKEND)()
+    return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(*, setting, **kwargs):
+    global _broker
+    if setting == 'PROJECT_EVENTS_BACKEND':
+        _broker = None
+
+
+def kanban_column(is_submitted, has_work_logs):
+    """Same rule as the kanban board's ``kanban_column`` annotation."""
+    if is_submitted:
+        return 'completed'
+    return 'in_progress' if has_work_logs else 'not_started'
+
+
+def publish_project_changed(project_id):
+    """After the current transaction commits, announce the project's new state."""
+    if settings.LIVE_UPDATES_ENABLED:
+        transaction.on_commit(lambda: _publish_project(project_id))
+
+
+def publish_work_log_added(work_log_id):
+    if settings.LIVE_UPDATES_ENABLED:
+        transaction.on_commit(lambda: _publish_work_log(work_log_id))
+
+
+def _publish_project(project_id):
+    from .models import Project, WorkLog
+
+    broker = get_broker()
+    if not broker.has_subscribers():
+        return
+    # Read back the committed row, so bulk touches and signal updates are included
+    project = (
+        Project.objects.filter(pk=project_id)
+        .annotate(has_work_logs=Exists(WorkLog.objects.filter(project=OuterRef('pk'))))
+        .values('id', 'user_id', 'name', 'is_submitted', 'version', 'has_work_logs')
+        .first()
+    )
+    if project is None:
+        return
+    broker.publish('project', project['id'], project['user_id'], {
+        'id': project['id'],
+        'name': project['name'],
+        'is_submitted': project['is_submitted'],
+        'column': kanban_column(project['is_submitted'], project['has_work_logs']),
+        'version': project['version'],
+    })
+
+
+def _publish_work_log(work_log_id):
+    from .models import WorkLog
+
+    broker = get_broker()
+    if not broker.has_subscribers():
+        return
+    work_log = WorkLog.objects.select_related('user', 'project').filter(pk=work_log_id).first()
+    if work_log is None:
+        return
+    # The work log card looks the same to every viewer, so it is rendered once here
+    broker.publish('work_log', work_log.project_id, work_log.project.user_id, {
+        'id': work_log.pk,
+        'project': work_log.project_id,
+        'html': render_to_string('projects/work_log_item.html', {'work_log': work_log}),
+    })
@@ -1,8 +1,10 @@
 import django_filters
 from .models import Project
+from .search import search_projects
 from django import forms
 
 class ProjectFilter(django_filters.FilterSet):
+    search = django_filters.CharFilter(method='filter_search', label='Search')
     name = django_filters.CharFilter(lookup_expr='icontains')
     category = django_filters.CharFilter(lookup_expr='icontains')
     company = django_filters.CharFilter(lookup_expr='icontains')
@@ -13,7 +15,10 @@ class ProjectFilter(django_filters.FilterSet):
 
     class Meta:
         model = Project
-        fields = ['name', 'category', 'company', 'is_submitted']
+        fields = ['search', 'name', 'category', 'company', 'is_submitted']
+
+    def filter_search(self, queryset, name, value):
+        return search_projects(queryset, value)
 
 from django import forms
 from django.contrib.auth import get_user_model
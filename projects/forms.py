@@ -1,8 +1,12 @@
+import logging
+
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from .models import Project, WorkLog
 
+logger = logging.getLogger(__name__)
+
 class WorkLogForm(forms.ModelForm):
     date = forms.DateField(
         label='Work Date',
@@ -70,10 +74,9 @@ class WorkLogForm(forms.ModelForm):
         return date
 
     def __init__(self, *args, **kwargs):
-        print("\n=== WorkLogForm.__init__ ===")
         self.user = kwargs.pop('user', None)
         self.project = kwargs.pop('project', None)
-        print(f"Initializing WorkLogForm - User: {self.user}, Project: {self.project}")
+        logger.debug("WorkLogForm init user=%s project=%s", self.user, self.project)
         super().__init__(*args, **kwargs)
         
         # Set up form field attributes
@@ -98,8 +101,6 @@ class WorkLogForm(forms.ModelForm):
             'required': True
         })
         
-        print("Form initialized successfully with fields:", self.fields.keys())
-
         if self.project:
             existing_log = WorkLog.objects.filter(
                 project=self.project,
@@ -111,6 +112,21 @@ class WorkLogForm(forms.ModelForm):
                     "You have already logged work for this project today."
                 )
 
+class WorkLogImportRowForm(forms.Form):
+    """Validates one imported work log row without touching the database."""
+    project_id = forms.IntegerField(min_value=1)
+    username = forms.CharField(required=False, max_length=150)
+    date = forms.DateField()
+    description = forms.CharField()
+    hours_worked = forms.DecimalField(min_value=0.5, max_value=24, decimal_places=1)
+
+    def clean_date(self):
+        date = self.cleaned_data['date']
+        if date > timezone.now().date():
+            raise forms.ValidationError("You cannot log work for future dates.")
+        return date
+
+
 class ProjectForm(forms.ModelForm):
     class Meta:
         model = Project
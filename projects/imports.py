@@ -0,0 +1,188 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .events import publish_project_changed
+from .forms import WorkLogImportRowForm
+from .models import Project, WorkLog
+from .rollups import rebuild_daily_stats
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+CONFLICT_MODES = ('skip', 'update')
+
+# Raised part-way through a file that is not UTF-8 or not valid CSV
+READ_ERRORS = (UnicodeDecodeError, csv.Error)
+
+
+def describe_read_error(exc):
+    if isinstance(exc, UnicodeDecodeError):
+        return 'The file is not UTF-8 text.'
+    return f'The file is not valid CSV: {exc}'
+
+
+def iter_rows(stream, fmt):
+    """Yield (line number, row dict) from a text stream without reading it all into memory."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = {'__error__': f"Invalid JSON: {exc}"}
+            yield line_number, row if isinstance(row, dict) else {'__error__': 'Expected a JSON object'}
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+class WorkLogImporter:
+    """
+    Validate and insert work logs in batches.
+
+    Each batch is checked with WorkLogImportRowForm, then projects and users
+    are resolved with one query each and the valid rows are written with one
+    bulk_create. Rows that hit the (project, user, date) unique constraint are
+    rejected with an error or, with ``on_conflict='update'``, overwrite the
+    existing log.
+    Errors go to ``on_error(line, errors)`` as they are found, so memory
+    use depends only on the batch size.
+    """
+
+    def __init__(self, default_user=None, restrict_to_user=None, on_conflict='skip',
+                 batch_size=1000, on_error=None):
+        self.default_user = default_user
+        self.restrict_to_user = restrict_to_user
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError(f"Unsupported on_conflict mode: {on_conflict}")
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda line, errors: None)
+        self.summary = {'rows': 0, 'accepted': 0, 'errors': 0}
+        self.touched_projects = set()
+        # Employees may only import their own logs on their own projects; directors are unrestricted
+        self.restricted = restrict_to_user is not None and not restrict_to_user.is_director()
+
+    def run(self, stream, fmt):
+        """
+        Import every row and return the summary.
+
+        A file that turns out not to be UTF-8 or valid CSV raises one of
+        READ_ERRORS; batches before the bad one stay imported, with their
+        rollups rebuilt, and ``summary`` reflects them.
+        """
+        rows = iter_rows(stream, fmt)
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch)
+        finally:
+            if self.touched_projects:
+                # bulk_create skips the signals that maintain the dashboard rollups and project versions
+                rebuild_daily_stats(project_ids=sorted(self.touched_projects))
+                Project.touch(*self.touched_projects)
+                for project_id in sorted(self.touched_projects):
+                    publish_project_changed(project_id)
+        return self.summary
+
+    def error(self, line, errors):
+        self.batch_errors.append((line, errors))
+
+    def import_batch(self, batch):
+        self.summary['rows'] += len(batch)
+        self.batch_errors = []
+        try:
+            self.write_batch(batch)
+        finally:
+            # Report in file order, whichever validation step rejected the row
+            self.summary['errors'] += len(self.batch_errors)
+            for line, errors in sorted(self.batch_errors, key=lambda error: error[0]):
+                self.on_error(line, errors)
+
+    def write_batch(self, batch):
+        valid = []
+        for line, row in batch:
+            if '__error__' in row:
+                self.error(line, {'__all__': [row['__error__']]})
+                continue
+            form = WorkLogImportRowForm(row)
+            if form.is_valid():
+                valid.append((line, form.cleaned_data))
+            else:
+                self.error(line, {field: list(errors) for field, errors in form.errors.items()})
+        if not valid:
+            return
+
+        project_ids = {data['project_id'] for _, data in valid}
+        projects = Project.objects.filter(pk__in=project_ids)
+        if self.restricted:
+            projects = projects.filter(user=self.restrict_to_user)
+        known_projects = set(projects.values_list('pk', flat=True))
+
+        usernames = {data['username'] for _, data in valid if data['username']}
+        users = dict(get_user_model().objects.filter(username__in=usernames).values_list('username', 'pk'))
+
+        logs = {}
+        for line, data in valid:
+            if data['project_id'] not in known_projects:
+                self.error(line, {'project_id': ['Unknown project or permission denied.']})
+                continue
+            if data['username']:
+                if data['username'] not in users:
+                    self.error(line, {'username': ['Unknown user.']})
+                    continue
+                user_id = users[data['username']]
+            elif self.default_user is not None:
+                user_id = self.default_user.pk
+            else:
+                self.error(line, {'username': ['This field is required.']})
+                continue
+
+            if self.restricted and user_id != self.restrict_to_user.pk:
+                self.error(line, {'username': ['You can only import your own work logs.']})
+                continue
+
+            key = (data['project_id'], user_id, data['date'])
+            if key in logs:
+                self.error(line, {'date': ['Duplicate of an earlier row for the same project, user and date.']})
+                continue
+            logs[key] = line, WorkLog(
+                project_id=data['project_id'], user_id=user_id, date=data['date'],
+                description=data['description'], hours_worked=data['hours_worked'],
+            )
+
+        if not logs:
+            return
+        options = {'ignore_conflicts': True}
+        if self.on_conflict == 'update':
+            options = {
+                'update_conflicts': True,
+                'unique_fields': ['project', 'user', 'date'],
+                'update_fields': ['description', 'hours_worked', 'updated_at'],
+            }
+        with transaction.atomic():
+            if self.on_conflict != 'update':
+                # ignore_conflicts drops these silently; find them first so each is reported
+                for key in self.existing_keys(logs):
+                    line, _ = logs.pop(key)
+                    self.error(line, {'date': ['A work log for this project, user and date already exists.']})
+            WorkLog.objects.bulk_create([log for _, log in logs.values()], **options)
+        self.summary['accepted'] += len(logs)
+        self.touched_projects.update(project_id for project_id, _, _ in logs)
+
+    def existing_keys(self, logs):
+        """The (project, user, date) keys in ``logs`` that are already stored, in one query."""
+        candidates = WorkLog.objects.filter(
+            project_id__in={project_id for project_id, _, _ in logs},
+            user_id__in={user_id for _, user_id, _ in logs},
+            date__in={date for _, _, date in logs},
+        ).values_list('project_id', 'user_id', 'date')
+        return [key for key in candidates if key in logs]
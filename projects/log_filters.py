@@ -0,0 +1,19 @@
+import logging
+import random
+
+
+class SampleFilter(logging.Filter):
+    """
+    Let through only a fraction (``rate``) of records at or below ``level``.
+
+    Meant for per-request debug tracing on hot paths; records above ``level``
+    (warnings and errors by default) are always kept.
+    """
+
+    def __init__(self, rate=1.0, level='DEBUG'):
+        super().__init__()
+        self.rate = float(rate)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        return record.levelno > self.level or random.random() < self.rate
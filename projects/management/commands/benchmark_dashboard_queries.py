@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from projects.models import Project, ProjectDailyStats
+from projects.stats import aget_project_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the async dashboard stats with PARALLEL_QUERIES off and on. "
+        "The data has to be committed for the worker connections to see it; it is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2_000)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        users, project = self.seed(options['days'], options['users'])
+        try:
+            self.run(project, options['repeat'])
+        finally:
+            # Only rollup rows were seeded, and those have no delete receivers, so this is one DELETE
+            ProjectDailyStats.objects.filter(project=project).delete()
+            project.delete()
+            get_user_model().objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def seed(self, day_count, user_count):
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            [User(username=f'bench-dashboard-{i}') for i in range(user_count)]
+        )
+        today = timezone.now().date()
+        project = Project.objects.create(
+            user=users[0], name='Dashboard benchmark', category='Benchmark',
+            tender_award_date=today - timedelta(days=day_count), completion_date=today, company='Benchmark',
+            location='Local', description='Synthetic data',
+        )
+        # Every fourth day is idle, so the gap query has work to do
+        days = [today - timedelta(days=i) for i in range(day_count) if i % 4 != 3]
+        ProjectDailyStats.objects.bulk_create(
+            [ProjectDailyStats(project=project, user=user, date=day, hours=Decimal('4.0'), log_count=1)
+             for day in days for user in users],
+            batch_size=5000,
+        )
+        self.stdout.write(f"Seeded {len(days) * len(users)} rollup rows over {len(days)} days")
+        return users, project
+
+    def run(self, project, repeat):
+        for label, parallel in (('sequential', False), ('parallel', True)):
+            with override_settings(PARALLEL_QUERIES=parallel):
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    async_to_sync(aget_project_stats)(project)
+                    timings.append(time.perf_counter() - start)
+            timings.sort()
+            self.stdout.write(
+                f"{label:<11} best {timings[0] * 1000:8.1f} ms  median {timings[len(timings) // 2] * 1000:8.1f} ms"
+            )
+        connections.close_all()
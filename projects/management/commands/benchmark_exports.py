@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from projects.exports import PROJECT_EXPORT_FIELDS, iter_csv, iter_export_rows, iter_xlsx
+from projects.models import Project
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Measure project export throughput (rows/second) on synthetic data. All data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'])
+                for fmt, writer in (('csv', iter_csv), ('xlsx', iter_xlsx)):
+                    self.measure(fmt, writer, options['rows'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count):
+        owner = get_user_model().objects.create(username='bench-export-owner')
+        today = timezone.now().date()
+        projects = (
+            Project(user=owner, name=f'Project {i}', category='Benchmark', company=f'Company {i % 500}',
+                    location='Local', description='Synthetic project ' * 5,
+                    tender_award_date=today - timedelta(days=i % 365), completion_date=today)
+            for i in range(count)
+        )
+        Project.objects.bulk_create(projects, batch_size=5000)
+
+    def measure(self, fmt, writer, count):
+        headers = [label for _, label in PROJECT_EXPORT_FIELDS]
+        queryset = Project.objects.filter(user__username='bench-export-owner')
+
+        start = time.perf_counter()
+        first_byte = None
+        size = 0
+        for chunk in writer(iter_export_rows(queryset, PROJECT_EXPORT_FIELDS), headers):
+            if first_byte is None and chunk:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{fmt:<5} {count / elapsed:10,.0f} rows/s  first byte {first_byte * 1000:6.1f} ms  "
+            f"{size / 1_000_000:7.1f} MB in {elapsed:5.2f} s"
+        )
@@ -0,0 +1,89 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from projects.models import Project, ProjectDailyStats, WorkLog
+from projects.stats import get_idle_gaps
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time idle-gap detection on a synthetic project. All data is rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logs', type=int, default=100_000)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                project = self.seed(options['logs'], options['users'])
+                self.run(project, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, log_count, user_count):
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            [User(username=f'bench-gaps-{i}') for i in range(user_count)]
+        )
+        today = timezone.now().date()
+        project = Project.objects.create(
+            user=users[0], name='Idle gap benchmark', category='Benchmark',
+            tender_award_date=today, completion_date=today, company='Benchmark',
+            location='Local', description='Synthetic data',
+        )
+
+        # Every third day is idle so there is a realistic number of gaps
+        days = -(-log_count // user_count)
+        active_days = [today - timedelta(days=i) for i in range(days * 3 // 2 + 1) if i % 3 != 2][:days]
+        logs = (
+            WorkLog(project=project, user=user, date=day,
+                    description='Synthetic work log ' * 10, hours_worked=Decimal('4.0'))
+            for day in active_days for user in users
+        )
+        WorkLog.objects.bulk_create(logs, batch_size=5000)
+        ProjectDailyStats.objects.bulk_create(
+            [ProjectDailyStats(project=project, user=user, date=day, hours=Decimal('4.0'), log_count=1)
+             for day in active_days for user in users],
+            batch_size=5000,
+        )
+        self.stdout.write(f"Seeded {len(active_days) * len(users)} logs over {len(active_days)} days")
+        return project
+
+    def run(self, project, repeat):
+        def python_rows():
+            # Previous implementation: materialise full WorkLog rows and diff in Python
+            dates = sorted(set(log.date for log in WorkLog.objects.filter(project=project)))
+            return [(dates[i - 1], dates[i]) for i in range(1, len(dates)) if (dates[i] - dates[i - 1]).days > 1]
+
+        def fallback():
+            features = connections[router.db_for_read(ProjectDailyStats)].features
+            original = features.supports_over_clause
+            features.supports_over_clause = False
+            try:
+                return get_idle_gaps(project.pk)
+            finally:
+                features.supports_over_clause = original
+
+        for label, func in (
+            ('full rows + python', python_rows),
+            ('distinct dates fallback', fallback),
+            ('LAG() window', lambda: get_idle_gaps(project.pk)),
+        ):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(f"{label:<26} best {min(timings) * 1000:8.1f} ms  ({len(result)} gaps)")
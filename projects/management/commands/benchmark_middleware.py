@@ -0,0 +1,41 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+
+from projects.middleware import RoleBasedAccessMiddleware
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request overhead of RoleBasedAccessMiddleware.process_view."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200_000)
+
+    def handle(self, *args, **options):
+        middleware = RoleBasedAccessMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+        # Unsaved employee: authenticated, so restricted views run the full check without a database hit
+        user = get_user_model()(username='bench-middleware', user_type='employee')
+        for path in ('/projects/', '/projects/create/', '/admin/', '/static/css/site.css'):
+            request = factory.get(path)
+            request.user = user
+            request._messages = CookieStorage(request)
+            try:
+                request.resolver_match = resolve(path)
+                view_func = request.resolver_match.func
+            except Resolver404:
+                # Static files never resolve; the middleware must bail out before touching resolver_match
+                request.resolver_match, view_func = None, None
+            self.measure(middleware, request, view_func, path, options['iterations'])
+
+    def measure(self, middleware, request, view_func, path, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            middleware.process_view(request, view_func, (), {})
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{path:<24} {elapsed / iterations * 1_000_000_000:8.0f} ns/request")
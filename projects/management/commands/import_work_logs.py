@@ -0,0 +1,56 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.imports import CONFLICT_MODES, IMPORT_FORMATS, READ_ERRORS, WorkLogImporter, describe_read_error
+
+
+class Command(BaseCommand):
+    help = "Stream work logs from a CSV or JSONL file into the database in validated batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row) or JSONL file.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Defaults to the file extension.')
+        parser.add_argument('--user', help='Username for rows without a username column.')
+        parser.add_argument('--on-conflict', choices=CONFLICT_MODES, default='skip',
+                            help='What to do with rows matching an existing (project, user, date) log.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in IMPORT_FORMATS:
+            raise CommandError(f"Cannot infer format from {path!r}; pass --format.")
+
+        default_user = None
+        if options['user']:
+            try:
+                default_user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown user {options['user']!r}")
+
+        def report(line, errors):
+            self.stderr.write(f"line {line}: {json.dumps(errors)}")
+
+        importer = WorkLogImporter(
+            default_user=default_user,
+            on_conflict=options['on_conflict'],
+            batch_size=options['batch_size'],
+            on_error=report,
+        )
+        with open(path, newline='', encoding='utf-8') as stream:
+            try:
+                summary = importer.run(stream, fmt)
+            except READ_ERRORS as exc:
+                summary = importer.summary
+                raise CommandError(
+                    f"{describe_read_error(exc)} Stopped after {summary['rows']} rows: "
+                    f"{summary['accepted']} accepted, {summary['errors']} rejected"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {summary['rows']} rows: {summary['accepted']} accepted, {summary['errors']} rejected"
+        ))
@@ -0,0 +1,136 @@
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent requests at the main views and report p50/p95/p99 latency per view. "
+        "Runs in-process through the Django test client, or against a running server with --base-url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username to browse as (default: the employee owning most projects).")
+        parser.add_argument('--requests', type=int, default=50, help="Requests per view.")
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--base-url', help="e.g. http://127.0.0.1:8000 to load a running server instead.")
+        parser.add_argument('--sessionid', help="Session cookie of a logged-in user, required with --base-url.")
+
+    def handle(self, *args, **options):
+        if options['base_url'] and not options['sessionid']:
+            raise CommandError("--base-url needs --sessionid (copy the sessionid cookie after logging in).")
+        self.base_url = (options['base_url'] or '').rstrip('/')
+        self.sessionid = options['sessionid']
+        self.local = threading.local()
+
+        self.user = self.get_user(options['user'])
+        paths = self.get_paths()
+        # Round-robin over the views so each one sees the same mix of concurrent load
+        jobs = [job for _ in range(options['requests']) for job in paths]
+
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(options['concurrency'], 1)) as executor:
+            for name, status, elapsed in executor.map(self.run_job, jobs):
+                timings[name].append(elapsed)
+                if status >= 400:
+                    errors[name] += 1
+        wall = time.perf_counter() - started
+
+        self.stdout.write(f"{'view':<24} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, _ in paths:
+            samples = timings[name]
+            p50, p95, p99 = self.percentiles(samples)
+            self.stdout.write(
+                f"{name:<24} {len(samples):>5} {errors[name]:>4} "
+                f"{p50:9.1f} {p95:9.1f} {p99:9.1f} {max(samples) * 1000:9.1f}"
+            )
+        self.stdout.write(f"{len(jobs)} requests in {wall:.1f} s ({len(jobs) / wall:.1f} req/s)")
+
+    def get_user(self, username):
+        User = get_user_model()
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {username!r}.")
+        user = (
+            User.objects.filter(user_type='employee')
+            .annotate(project_count=Count('projects'))
+            .filter(project_count__gt=0)
+            .order_by('-project_count')
+            .first()
+        )
+        if user is None:
+            raise CommandError("No employee owns a project; run seed_perf first.")
+        return user
+
+    def get_paths(self):
+        project = (
+            Project.objects.filter(user=self.user).annotate(log_count=Count('work_logs'))
+            .order_by('-log_count').first()
+        )
+        paths = [
+            ('list', reverse('projects:list')),
+            ('list (cursor)', reverse('projects:list') + '?cursor='),
+            ('kanban', reverse('projects:kanban')),
+            ('timeline', reverse('projects:timeline')),
+            ('api projects', reverse('projects:api_projects')),
+        ]
+        if project:
+            paths += [
+                ('detail', reverse('projects:detail', args=[project.pk])),
+                ('dashboard', reverse('projects:project_dashboard', args=[project.pk])),
+                ('api stats', reverse('projects:api_project_stats', args=[project.pk])),
+            ]
+        return paths
+
+    def run_job(self, job):
+        name, path = job
+        start = time.perf_counter()
+        status = self.fetch_remote(path) if self.base_url else self.fetch_local(path)
+        return name, status, time.perf_counter() - start
+
+    def fetch_local(self, path):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            # One logged-in test client (and so one database connection) per worker thread
+            host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+            client = self.local.client = Client(HTTP_HOST=host)
+            client.force_login(self.user)
+        response = client.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code
+
+    def fetch_remote(self, path):
+        request = urllib.request.Request(self.base_url + path, headers={'Cookie': f'sessionid={self.sessionid}'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    @staticmethod
+    def percentiles(samples):
+        """p50, p95 and p99 in milliseconds."""
+        if len(samples) < 2:
+            value = samples[0] * 1000 if samples else 0.0
+            return value, value, value
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from projects.campaigns import purge_feedback_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete used and expired client feedback tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_feedback_tokens(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} feedback tokens"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from projects.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or backfill missing) ProjectDailyStats rollups from work logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects',
+                            help='Only rebuild these project ids (can be repeated).')
+        parser.add_argument('--backfill', action='store_true',
+                            help='Only insert missing rollup rows, keep existing ones.')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted, processed = rebuild_daily_stats(
+            project_ids=options['projects'],
+            backfill=options['backfill'],
+            chunk_size=options['chunk_size'],
+        )
+        if not options['backfill']:
+            self.stdout.write(f"Removed {deleted} rollup rows")
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} rollup rows"))
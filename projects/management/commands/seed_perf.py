@@ -0,0 +1,198 @@
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from projects.models import FeedbackToken, Project, ProjectDailyStats, WorkLog
+from projects.rollups import rebuild_daily_stats
+from users.cache import invalidate_user_list
+
+USERNAME_PREFIX = 'perf-'
+CATEGORIES = ('Solar', 'Wind', 'Hydro', 'Grid', 'Storage', 'Substation', 'Metering', 'Maintenance')
+CITIES = ('Pune', 'Mumbai', 'Chennai', 'Jaipur', 'Delhi', 'Bengaluru', 'Ahmedabad', 'Nagpur', 'Indore', 'Surat')
+TASKS = ('Site survey', 'Cable laying', 'Panel installation', 'Inverter testing', 'Client meeting',
+         'Documentation', 'Commissioning', 'Inspection', 'Procurement follow-up', 'Safety audit')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, projects and work logs for performance testing. "
+        "Seeded users are named perf-*; use --clear to remove a previous run first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--projects', type=int, default=100_000)
+        parser.add_argument('--logs', type=int, default=20_000_000)
+        parser.add_argument('--directors', type=float, default=0.02, help="Fraction of users that are directors.")
+        parser.add_argument('--chunk-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable data sets.")
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded perf-* data first.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.today = timezone.now().date()
+
+        if options['clear']:
+            deleted = self.clear_previous_run()
+            self.stdout.write(f"Deleted {deleted:,} rows from the previous run")
+
+        users = self.seed_users(options['users'], options['directors'])
+        employees = [user for user in users if not user.is_director()] or users
+        projects = self.seed_projects(employees, options['projects'])
+        logs = self.seed_work_logs(projects, employees, options['logs'])
+        self.stdout.write(f"Seeded {len(users):,} users, {len(projects):,} projects, {logs:,} work logs")
+
+        self.stdout.write("Building dashboard rollups...")
+        # bulk_create skips the rollup signals; backfill only adds the missing rows
+        rebuild_daily_stats(backfill=True, chunk_size=self.chunk_size)
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def clear_previous_run(self):
+        """
+        Delete the perf-* users and everything that hangs off them, child tables first.
+
+        A cascading ORM delete would load every work log and run its
+        post_delete receiver; here each table is cleared with raw DELETEs of
+        ``chunk_size`` rows. Rollups of other users' projects that seeded users
+        logged time on are rebuilt afterwards.
+        """
+        User = get_user_model()
+        users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        projects = Project.objects.filter(user__in=users)
+        touched = list(
+            WorkLog.objects.filter(user__in=users).exclude(project__in=projects)
+            .order_by().values_list('project_id', flat=True).distinct()
+        )
+
+        deleted = 0
+        for queryset in (
+            WorkLog.objects.filter(Q(project__in=projects) | Q(user__in=users)),
+            ProjectDailyStats.objects.filter(Q(project__in=projects) | Q(user__in=users)),
+            FeedbackToken.objects.filter(project__in=projects),
+            projects,
+            LogEntry.objects.filter(user__in=users),
+            User.groups.through.objects.filter(user__in=users),
+            User.user_permissions.through.objects.filter(user__in=users),
+            users,
+        ):
+            deleted += self.raw_delete_in_batches(queryset)
+
+        if touched:
+            rebuild_daily_stats(project_ids=touched, chunk_size=self.chunk_size)
+        # Raw deletes skip the signals that refresh the cached users
+        invalidate_user_list()
+        return deleted
+
+    def raw_delete_in_batches(self, queryset):
+        meta = queryset.model._meta
+        table, pk = connection.ops.quote_name(meta.db_table), connection.ops.quote_name(meta.pk.column)
+        deleted = last_pk = 0
+        pks = queryset.order_by('pk').values_list('pk', flat=True)
+        while ids := list(pks.filter(pk__gt=last_pk)[:self.chunk_size]):
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {table} WHERE {pk} IN ({", ".join(["%s"] * len(ids))})', ids)
+                deleted += cursor.rowcount
+            last_pk = ids[-1]
+        return deleted
+
+    def seed_users(self, count, director_share):
+        # Hashing is deliberately slow; every seeded user shares the password "perf"
+        password = make_password('perf')
+        directors = max(1, round(count * director_share))
+        User = get_user_model()
+        users = [
+            User(username=f'{USERNAME_PREFIX}{"director" if i < directors else "user"}-{i}', password=password,
+                 email=f'{USERNAME_PREFIX}{i}@example.com', user_type='director' if i < directors else 'employee')
+            for i in range(count)
+        ]
+        User.objects.bulk_create(users, batch_size=self.chunk_size)
+        # bulk_create skips the signal that refreshes the cached user list
+        invalidate_user_list()
+        return list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('pk'))
+
+    def seed_projects(self, employees, count):
+        # A few employees own most projects, as in production (Pareto-weighted owners)
+        owner_weights = list(accumulate(self.random.paretovariate(1.2) for _ in employees))
+        companies = [f'Company {i}' for i in range(max(count // 50, 1))]
+        company_weights = list(accumulate(1 / (rank + 1) for rank in range(len(companies))))  # Zipf-like
+
+        def projects():
+            for i in range(count):
+                tender = self.today - timedelta(days=self.random.randint(0, 3 * 365))
+                completion = tender + timedelta(days=self.random.randint(30, 540))
+                submitted = completion < self.today and self.random.random() < 0.7
+                yield Project(
+                    user=self.random.choices(employees, cum_weights=owner_weights)[0],
+                    name=f'{self.random.choice(CATEGORIES)} project {i}',
+                    category=self.random.choice(CATEGORIES),
+                    tender_award_date=tender,
+                    completion_date=completion,
+                    company=self.random.choices(companies, cum_weights=company_weights)[0],
+                    location=self.random.choice(CITIES),
+                    description=f'Synthetic project {i} for load testing. ' * self.random.randint(1, 8),
+                    is_submitted=submitted,
+                    submission_date=self.as_datetime(completion) if submitted else None,
+                    created_at=self.as_datetime(tender),
+                    client_email=f'client{i}@example.com' if self.random.random() < 0.5 else None,
+                )
+
+        created = []
+        for batch in chunked(projects(), self.chunk_size):
+            created += Project.objects.bulk_create(batch)
+            self.stdout.write(f"  projects: {len(created):,}/{count:,}")
+        return created
+
+    def seed_work_logs(self, projects, employees, count):
+        """
+        Spread ``count`` logs over the projects with a long-tailed split.
+
+        Logs fall on distinct days inside each project's active window; most
+        are by the owner, some by colleagues.
+        """
+        weights = [self.random.expovariate(1) for _ in projects]
+        scale = count / sum(weights)
+
+        def logs():
+            for project, weight in zip(projects, weights):
+                end = min(project.completion_date, self.today)
+                days = (end - project.tender_award_date).days + 1
+                if days <= 0:
+                    continue
+                wanted = min(round(weight * scale), days)
+                for offset in self.random.sample(range(days), wanted):
+                    user = project.user if self.random.random() < 0.85 else self.random.choice(employees)
+                    yield WorkLog(
+                        project=project,
+                        user=user,
+                        date=project.tender_award_date + timedelta(days=offset),
+                        description=self.random.choice(TASKS),
+                        hours_worked=Decimal(self.random.randint(1, 20)) / 2,
+                    )
+
+        created = 0
+        for batch in chunked(islice(logs(), count), self.chunk_size):
+            # Dates are sampled without replacement per project, so (project, user, date) never collides
+            WorkLog.objects.bulk_create(batch)
+            created += len(batch)
+            if created % (self.chunk_size * 10) == 0:
+                self.stdout.write(f"  work logs: {created:,}/{count:,}")
+        return created
+
+    def as_datetime(self, day):
+        return timezone.make_aware(datetime.combine(day, time(9)) + timedelta(minutes=self.random.randint(0, 600)))
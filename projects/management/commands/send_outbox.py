@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from projects.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued EmailOutbox rows in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Emails claimed per batch (default: OUTBOX_BATCH_SIZE).')
+        parser.add_argument('--concurrency', type=int,
+                            help='Parallel SMTP connections per batch (default: OUTBOX_CONCURRENCY).')
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once drained.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when idle in --loop mode.')
+
+    def handle(self, *args, **options):
+        total_sent = 0
+        while True:
+            claimed, sent = drain_outbox(options['batch_size'], options['concurrency'])
+            total_sent += sent
+            if claimed:
+                self.stdout.write(f"Sent {sent}/{claimed} emails")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained, {total_sent} emails sent"))
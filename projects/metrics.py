@@ -0,0 +1,73 @@
+import threading
+from bisect import bisect_left
+
+from .cache import counters
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Metric name -> (help text, bucket upper bounds); every metric is labelled by URL name
+HISTOGRAMS = {
+    'projects_request_duration_seconds': ('Wall time spent handling the request.', SECONDS_BUCKETS),
+    'projects_db_queries': ('Database queries executed per request.', COUNT_BUCKETS),
+    'projects_db_query_duration_seconds': ('Time spent in database queries per request.', SECONDS_BUCKETS),
+    'projects_template_render_seconds': ('Time spent rendering templates per request.', SECONDS_BUCKETS),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; cumulated only when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms = {}
+
+
+def observe(metric, view, value):
+    with _lock:
+        histogram = _histograms.get((metric, view))
+        if histogram is None:
+            histogram = _histograms[(metric, view)] = Histogram(HISTOGRAMS[metric][1])
+        histogram.observe(value)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """All histograms and cache counters in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for metric, (help_text, buckets) in HISTOGRAMS.items():
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+            for (name, view), histogram in sorted(_histograms.items()):
+                if name != metric:
+                    continue
+                view = _label(view)
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{view="{view}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{view="{view}"}} {histogram.count}')
+
+    lines += ['# HELP projects_cache_events_total Cache hits and misses.', '# TYPE projects_cache_events_total counter']
+    for event, count in sorted(counters.items()):
+        lines.append(f'projects_cache_events_total{{event="{_label(event)}"}} {count}')
+    return '\n'.join(lines) + '\n'
@@ -1 +1,3 @@
-from .role_based_access import RoleBasedAccessMiddleware
\ No newline at end of file
+from .instrumentation import InstrumentationMiddleware
+from .read_your_writes import ReadYourWritesMiddleware
+from .role_based_access import RoleBasedAccessMiddleware
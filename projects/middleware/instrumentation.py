@@ -0,0 +1,86 @@
+import contextvars
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from projects import metrics
+
+# Per-request counters for the request being handled in the current thread/task
+current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute_wrapper counting queries and their duration."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+
+def install_template_timer():
+    """Time top-level Django template renders (render(), TemplateResponse, render_to_string)."""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'instrumented', False):
+        return
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        stats = current_stats.get()
+        if stats is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+    render.instrumented = True
+    Template.render = render
+
+
+class InstrumentationMiddleware:
+    """
+    Record wall time, query count/time and template time per URL name.
+
+    Opt-in with REQUEST_METRICS_ENABLED; when off, Django drops the middleware
+    at startup. Figures go to the in-process histograms in ``projects.metrics``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        metrics.observe('projects_request_duration_seconds', view, elapsed)
+        metrics.observe('projects_db_queries', view, stats.queries)
+        metrics.observe('projects_db_query_duration_seconds', view, stats.query_time)
+        metrics.observe('projects_template_render_seconds', view, stats.template_time)
+        return response
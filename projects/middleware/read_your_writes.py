@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+from ..routers import STICKY_COOKIE
+
+
+class ReadYourWritesMiddleware(MiddlewareMixin):
+    """
+    After any write request, pin the user's reads to the primary for a while.
+
+    The deadline travels in a cookie, so it needs no session write and covers
+    the redirect that follows a POST. Without read replicas the middleware
+    removes itself.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + seconds:.0f}', max_age=seconds,
+                                httponly=True, samesite='Lax')
+        return response
@@ -1,32 +1,42 @@
-from django.shortcuts import redirect
-from django.urls import reverse
+from django.conf import settings
 from django.contrib import messages
+from django.shortcuts import redirect
+from django.utils.deprecation import MiddlewareMixin
 
-class RoleBasedAccessMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+# URL name -> message for a director who tries to use an employee-only view.
+# Director-only views answer 403 themselves (UserPassesTestMixin), and the
+# admin is not listed: Django already limits it to staff, and superusers
+# created with createsuperuser are employees until the admin makes them directors.
+EMPLOYEE_ONLY = {
+    'projects:create': "Directors cannot create projects.",
+}
 
-    def __call__(self, request):
-        response = self.get_response(request)
-        return response
+
+class RoleBasedAccessMiddleware(MiddlewareMixin):
+    """
+    Redirect directors away from views reserved for employees.
+
+    Per request the check is a dict lookup of ``request.resolver_match`` in
+    EMPLOYEE_ONLY, and the user is only loaded for the few restricted views.
+    Static and media files are skipped before anything else. MiddlewareMixin
+    makes it usable in both sync and async (ASGI) stacks.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.skipped_prefixes = tuple(
+            '/' + url.lstrip('/') for url in (settings.STATIC_URL, settings.MEDIA_URL) if url
+        )
 
     def process_view(self, request, view_func, view_args, view_kwargs):
-        if not request.user.is_authenticated:
+        if request.path_info.startswith(self.skipped_prefixes):
             return None
 
-        # Get the view name from the function
-        view_name = view_func.__name__.lower()
-
-        # Director-only views
-        director_only_views = ['adminsite']
-        if any(view in view_name for view in director_only_views) and not request.user.is_director():
-            messages.error(request, "You don't have permission to access this page.")
-            return redirect('projects:list')
+        message = EMPLOYEE_ONLY.get(request.resolver_match.view_name)
+        if message is None or not request.user.is_authenticated:
+            return None
 
-        # Employee-only views (e.g., project creation)
-        employee_only_views = ['projectcreate']
-        if any(view in view_name for view in employee_only_views) and request.user.is_director():
-            messages.error(request, "Directors cannot create projects.")
+        if request.user.is_director():
+            messages.error(request, message)
             return redirect('projects:list')
-
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_daily_stats(apps, schema_editor):
+    WorkLog = apps.get_model("projects", "WorkLog")
+    ProjectDailyStats = apps.get_model("projects", "ProjectDailyStats")
+    rollups = (
+        WorkLog.objects.order_by()
+        .values("project_id", "user_id", "date")
+        .annotate(hours=models.Sum("hours_worked"), log_count=models.Count("id"))
+    )
+    ProjectDailyStats.objects.bulk_create(
+        (ProjectDailyStats(**row) for row in rollups.iterator(chunk_size=5000)),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_feedbacktoken"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "hours",
+                    models.DecimalField(decimal_places=1, default=0, max_digits=8),
+                ),
+                ("log_count", models.PositiveIntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Project daily stats",
+                "ordering": ["date"],
+                "unique_together": {("project", "user", "date")},
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
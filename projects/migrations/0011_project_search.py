@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:35
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    CREATE FUNCTION projects_project_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.company, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.location, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER projects_project_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, company, location, description, search_vector
+    ON projects_project
+    FOR EACH ROW EXECUTE FUNCTION projects_project_search_vector_update()
+    """,
+    # Fires the trigger once for existing rows
+    "UPDATE projects_project SET name = name",
+    "CREATE INDEX projects_project_search_vector_gin ON projects_project USING gin (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS projects_project_search_vector_gin",
+    "DROP TRIGGER IF EXISTS projects_project_search_vector_trigger ON projects_project",
+    "DROP FUNCTION IF EXISTS projects_project_search_vector_update()",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE projects_project_fts USING fts5(
+        name, company, location, description,
+        content='projects_project', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER projects_project_fts_insert AFTER INSERT ON projects_project BEGIN
+        INSERT INTO projects_project_fts(rowid, name, company, location, description)
+        VALUES (new.id, new.name, new.company, new.location, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_project_fts_delete AFTER DELETE ON projects_project BEGIN
+        INSERT INTO projects_project_fts(projects_project_fts, rowid, name, company, location, description)
+        VALUES ('delete', old.id, old.name, old.company, old.location, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_project_fts_update AFTER UPDATE ON projects_project BEGIN
+        INSERT INTO projects_project_fts(projects_project_fts, rowid, name, company, location, description)
+        VALUES ('delete', old.id, old.name, old.company, old.location, old.description);
+        INSERT INTO projects_project_fts(rowid, name, company, location, description)
+        VALUES (new.id, new.name, new.company, new.location, new.description);
+    END
+    """,
+    "INSERT INTO projects_project_fts(projects_project_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS projects_project_fts_update",
+    "DROP TRIGGER IF EXISTS projects_project_fts_delete",
+    "DROP TRIGGER IF EXISTS projects_project_fts_insert",
+    "DROP TABLE IF EXISTS projects_project_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgres, "sqlite": sqlite}.get(
+            schema_editor.connection.vendor, []
+        )
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0010_emailoutbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_REVERSE, SQLITE_REVERSE),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_COLUMNS = ["name", "company", "category"]
+SIMILARITY_COLUMNS = ["company", "category"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # icontains compiles to UPPER(col) LIKE UPPER(%s), so index the same expression
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS projects_project_{column}_upper_trgm "
+            f"ON projects_project USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+    # Plain column indexes serve the % similarity operator used for suggestions
+    for column in SIMILARITY_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS projects_project_{column}_trgm "
+            f"ON projects_project USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS projects_project_{column}_upper_trgm"
+        )
+    for column in SIMILARITY_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS projects_project_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0011_project_search"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
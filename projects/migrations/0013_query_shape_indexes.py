@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0012_project_trigram_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feedbacktoken",
+            index=models.Index(
+                condition=models.Q(("used", False)),
+                fields=["project", "created_at"],
+                name="feedbacktoken_unused_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["user", "-created_at"], name="project_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="project_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectdailystats",
+            index=models.Index(
+                fields=["project", "date"],
+                include=("hours",),
+                name="dailystats_project_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="worklog",
+            index=models.Index(
+                fields=["project", "-date", "-created_at"],
+                include=("hours_worked",),
+                name="worklog_project_date_idx",
+            ),
+        ),
+    ]
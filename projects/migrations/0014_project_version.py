@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:45
+
+from importlib import import_module
+
+import django.utils.timezone
+from django.db import migrations, models
+
+project_search = import_module("projects.migrations.0011_project_search")
+
+# SQLite rebuilds projects_project to add NOT NULL columns, which drops the FTS5
+# sync triggers from 0011; put them back (the FTS table and its rows survive).
+SQLITE_TRIGGERS = project_search.SQLITE_FORWARD[1:4]
+SQLITE_DROP_TRIGGERS = project_search.SQLITE_REVERSE[:3]
+
+restore_triggers = project_search.run_for_vendor(
+    [], SQLITE_DROP_TRIGGERS + SQLITE_TRIGGERS
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0013_query_shape_indexes"),
+    ]
+
+    operations = [
+        # Runs last when unapplying, after the column removals rebuild the table again
+        migrations.RunPython(migrations.RunPython.noop, restore_triggers),
+        migrations.AddField(
+            model_name="project",
+            name="changed_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:21
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+import projects.models
+
+
+def backfill_expiry(apps, schema_editor):
+    # Existing tokens expire relative to when they were issued, and used ones
+    # are purgeable straight away, instead of everything getting "now + TTL"
+    FeedbackToken = apps.get_model("projects", "FeedbackToken")
+    FeedbackToken.objects.filter(used=True).update(expires_at=F("created_at"))
+    FeedbackToken.objects.filter(used=False).update(
+        expires_at=F("created_at") + timedelta(days=settings.FEEDBACK_TOKEN_TTL_DAYS)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0014_project_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feedbacktoken",
+            name="expires_at",
+            field=models.DateTimeField(
+                db_index=True, default=projects.models.feedback_token_expiry
+            ),
+        ),
+        migrations.RunPython(backfill_expiry, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 
 class Project(models.Model):
@@ -26,13 +29,42 @@ class Project(models.Model):
     client_email = models.EmailField(null=True, blank=True)
     client_feedback = models.TextField(null=True, blank=True)
     client_confirmed_completed = models.BooleanField(default=False)
+    # Filled by a database trigger on PostgreSQL (see migration 0011); SQLite uses an FTS5 table instead
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Bumped whenever the project or one of its work logs changes; drives ETag/Last-Modified
+    version = models.PositiveIntegerField(default=1, editable=False)
+    changed_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Employee list/kanban/timeline: own projects, newest first
+            models.Index(fields=['user', '-created_at'], name='project_user_created_idx'),
+            # Director list and keyset pagination over all projects
+            models.Index(fields=['-created_at', '-id'], name='project_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        # Incremented in the UPDATE itself, so a touch() since this instance was
+        # loaded is counted too instead of being overwritten with a stale value
+        self.version = models.F('version') + 1
+        self.changed_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'changed_at'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
+    @classmethod
+    def touch(cls, *project_ids):
+        """Bump the version of projects changed without going through Project.save()."""
+        return cls.objects.filter(pk__in=project_ids).update(version=models.F('version') + 1,
+                                                             changed_at=timezone.now())
+
 
 class WorkLog(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='work_logs')
@@ -47,20 +79,115 @@ class WorkLog(models.Model):
         ordering = ['-date', '-created_at']
         # Ensure a user can only create one work log per project per day
         unique_together = ['project', 'user', 'date']
+        indexes = [
+            # A project's logs in display order; hours included for index-only aggregates on PostgreSQL
+            models.Index(fields=['project', '-date', '-created_at'], name='worklog_project_date_idx',
+                         include=['hours_worked']),
+        ]
 
     def __str__(self):
         return f"{self.project.name} - {self.date} - {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        # Keep the row and its ProjectDailyStats rollup (updated from signals) in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+class ProjectDailyStats(models.Model):
+    """Per project, day and user rollup of work logs, maintained from WorkLog signals."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='daily_stats')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    hours = models.DecimalField(max_digits=8, decimal_places=1, default=0)
+    log_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ['project', 'user', 'date']
+        verbose_name_plural = 'Project daily stats'
+        indexes = [
+            models.Index(fields=['project', 'date'], name='dailystats_project_date_idx', include=['hours']),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} - {self.date} - {self.user_id}: {self.hours}h"
+
 
 
 import uuid
 
+def feedback_token_expiry():
+    return timezone.now() + timedelta(days=settings.FEEDBACK_TOKEN_TTL_DAYS)
+
+
 class FeedbackToken(models.Model):
+    """
+    One-time link for a client to leave feedback on a project.
+
+    Consuming a token also ends its life (``expires_at`` becomes the time of
+    use), so used and expired tokens alike are ``expires_at < now`` for the
+    purge_feedback_tokens command.
+    """
     project = models.ForeignKey('Project', on_delete=models.CASCADE)
     token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=feedback_token_expiry, db_index=True)
     used = models.BooleanField(default=False)
 
-    def mark_used(self):
-        self.used = True
-        self.save()
\ No newline at end of file
+    class Meta:
+        indexes = [
+            # Only outstanding tokens are looked up by project/age; used ones are never queried
+            models.Index(fields=['project', 'created_at'], name='feedbacktoken_unused_idx',
+                         condition=models.Q(used=False)),
+        ]
+
+    def is_usable(self):
+        return not self.used and self.expires_at > timezone.now()
+
+    def consume(self):
+        """
+        Mark the token used with one conditional UPDATE.
+
+        Returns False if it was already used (say, by a concurrent submit) or
+        has expired; exactly one caller can win.
+        """
+        now = timezone.now()
+        consumed = FeedbackToken.objects.filter(pk=self.pk, used=False, expires_at__gt=now).update(
+            used=True, expires_at=now
+        )
+        if consumed:
+            self.used, self.expires_at = True, now
+        return bool(consumed)
+
+
+class EmailOutbox(models.Model):
+    """Outgoing email queued in the caller's transaction and delivered by the send_outbox worker."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.to} - {self.subject} ({self.status})"
+
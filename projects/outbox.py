@@ -0,0 +1,117 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, body, to, from_email=None):
+    """Queue one email. Call inside the transaction that creates the data it refers to."""
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def queue_emails(messages):
+    """Queue many ``(subject, body, to)`` emails with one INSERT; same transaction rule as queue_email."""
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(subject=subject, body=body, to=to, from_email=settings.DEFAULT_FROM_EMAIL)
+        for subject, body, to in messages
+    ])
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to ``batch_size`` due emails.
+
+    Rows are locked with SKIP LOCKED where supported and their next attempt is
+    pushed past the lease timeout, so concurrent workers never pick the same rows.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by('id'))
+
+
+def deliver(emails):
+    """Send emails over one reused connection, recording success or scheduling a retry per row."""
+    sent = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            schedule_retry(email, exc)
+        return sent
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, email.from_email, [email.to], connection=connection)
+            try:
+                message.send()
+            except Exception as exc:
+                schedule_retry(email, exc)
+            else:
+                EmailOutbox.objects.filter(pk=email.pk).update(
+                    status='sent', sent_at=timezone.now(), attempts=email.attempts + 1, last_error=''
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def schedule_retry(email, exc):
+    attempts = email.attempts + 1
+    if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        status, next_attempt_at = 'failed', timezone.now()
+        logger.error("Giving up on outbox email %s after %s attempts: %s", email.pk, attempts, exc)
+    else:
+        # Exponential backoff: base, 2 x base, 4 x base, ...
+        delay = settings.OUTBOX_RETRY_BACKOFF * (2 ** (attempts - 1))
+        status, next_attempt_at = 'pending', timezone.now() + timedelta(seconds=delay)
+        logger.warning("Outbox email %s failed (attempt %s), retrying in %ss: %s", email.pk, attempts, delay, exc)
+    EmailOutbox.objects.filter(pk=email.pk).update(
+        status=status, attempts=attempts, next_attempt_at=next_attempt_at, last_error=str(exc)
+    )
+
+
+def _deliver_in_thread(emails):
+    try:
+        return deliver(emails)
+    finally:
+        connections.close_all()
+
+
+def drain_outbox(batch_size=None, concurrency=None):
+    """Claim and send one batch of due emails. Returns (claimed, sent)."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    concurrency = max(concurrency or settings.OUTBOX_CONCURRENCY, 1)
+
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+    if concurrency == 1:
+        return len(emails), deliver(emails)
+
+    # One SMTP connection per worker thread, each sending an interleaved slice of the batch
+    slices = [emails[i::concurrency] for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        sent = sum(executor.map(_deliver_in_thread, [s for s in slices if s]))
+    return len(emails), sent
@@ -0,0 +1,51 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def encode_cursor(created_at, pk):
+    """Opaque cursor pointing at the last row of a page."""
+    return urlsafe_base64_encode(force_bytes(f"{created_at.isoformat()}|{pk}"))
+
+
+def decode_cursor(cursor):
+    """Return (created_at, pk) from a cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        created_at, pk = urlsafe_base64_decode(cursor).decode().split('|')
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if created_at is None:
+        return None
+    return created_at, pk
+
+
+def keyset_page(queryset, cursor, page_size):
+    """
+    Return (rows, next_cursor) for the page after ``cursor``, newest first.
+
+    Seeks on (created_at, id) instead of using OFFSET, so every page costs the
+    same no matter how deep it is. No COUNT(*) is issued; one extra row is read
+    to know whether a next page exists. Works on model and ``values()``
+    querysets; the latter must select ``id`` and ``created_at``.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.pk)
+    return rows, next_cursor
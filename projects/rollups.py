@@ -0,0 +1,50 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .cache import DASHBOARD_CACHE, invalidate_project_stats
+from .models import ProjectDailyStats, WorkLog
+
+
+def rebuild_daily_stats(project_ids=None, backfill=False, chunk_size=5000):
+    """
+    Recompute ProjectDailyStats from work logs, for all projects or only ``project_ids``.
+
+    Needed after writes that skip model signals (bulk_create, queryset.update).
+    With ``backfill`` existing rollup rows are kept and only missing ones are
+    inserted. Returns (deleted, processed) row counts.
+    """
+    logs = WorkLog.objects.all()
+    if project_ids is not None:
+        logs = logs.filter(project_id__in=project_ids)
+    rollups = (
+        logs.order_by()
+        .values('project_id', 'user_id', 'date')
+        .annotate(hours=Sum('hours_worked'), log_count=Count('id'))
+        .iterator(chunk_size=chunk_size)
+    )
+
+    deleted = processed = 0
+    with transaction.atomic():
+        if not backfill:
+            existing = ProjectDailyStats.objects.all()
+            if project_ids is not None:
+                existing = existing.filter(project_id__in=project_ids)
+            deleted, _ = existing.delete()
+
+        batch = []
+        for row in rollups:
+            batch.append(ProjectDailyStats(**row))
+            if len(batch) >= chunk_size:
+                ProjectDailyStats.objects.bulk_create(batch, ignore_conflicts=True)
+                processed += len(batch)
+                batch = []
+        if batch:
+            ProjectDailyStats.objects.bulk_create(batch, ignore_conflicts=True)
+            processed += len(batch)
+
+    if project_ids is not None:
+        invalidate_project_stats(*project_ids)
+    else:
+        caches[DASHBOARD_CACHE].clear()
+    return deleted, processed
@@ -0,0 +1,108 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Browser cookie holding the time until which the user's reads stay on the primary
+STICKY_COOKIE = 'primary_reads_until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def _target(alias):
+    config = connections[alias].settings_dict
+    return config['ENGINE'], str(config['NAME']), config.get('HOST'), config.get('PORT')
+
+
+def replica_aliases():
+    """
+    The configured replicas, minus any that are the primary's own database.
+
+    That is what a SQLite test mirror becomes; reading through it would only
+    escape the test's transaction.
+    """
+    primary = _target(DEFAULT_DB_ALIAS)
+    return [alias for alias in settings.DATABASE_REPLICAS if _target(alias) != primary]
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica while a ``read_from_replica`` view runs.
+
+    All other reads, and every write and migration, go to "default". With no
+    replicas configured this router never changes anything.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def is_sticky(request):
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def use_replica(request):
+    return request.method in ('GET', 'HEAD') and not is_sticky(request) and bool(replica_aliases())
+
+
+def _render(response):
+    # Template responses render after the view returns; do it while still routed
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()
+    return response
+
+
+def read_from_replica(view):
+    """
+    Route the view's reads to a replica for GET/HEAD requests.
+
+    Only for views that never write. A user who wrote within the last
+    REPLICA_STICKY_SECONDS keeps reading from the primary (see
+    ReadYourWritesMiddleware). Works on sync and async views; ORM calls
+    made through sync_to_async inherit the routing.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not use_replica(request):
+                return await view(request, *args, **kwargs)
+            token = _replica_reads.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not use_replica(request):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return _render(view(request, *args, **kwargs))
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
@@ -0,0 +1,86 @@
+import difflib
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'english'
+
+FTS_MATCH_SQL = "SELECT rowid FROM projects_project_fts WHERE projects_project_fts MATCH %s"
+FTS_RANK_SQL = (
+    "SELECT bm25(projects_project_fts, 10.0, 5.0, 2.0, 1.0) FROM projects_project_fts "
+    "WHERE projects_project_fts MATCH %s AND rowid = projects_project.id"
+)
+
+
+def fts5_query(text):
+    """Turn free text into an FTS5 query that prefix-matches every word."""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_projects(queryset, text):
+    """
+    Filter projects by full-text relevance on name, company, location and description.
+
+    PostgreSQL uses the trigger-maintained ``search_vector`` column (GIN
+    indexed); SQLite uses the ``projects_project_fts`` FTS5 table. Results are
+    ordered best match first. Other backends fall back to ``icontains``.
+    """
+    text = text.strip()
+    if not text:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F('search_vector'), query))
+            .order_by('-search_rank', '-created_at')
+        )
+
+    if vendor == 'sqlite':
+        match = fts5_query(text)
+        if not match:
+            return queryset.none()
+        return (
+            queryset.filter(pk__in=RawSQL(FTS_MATCH_SQL, [match]))
+            # bm25() is lower for better matches; negate so both backends sort descending
+            .annotate(search_rank=-RawSQL(FTS_RANK_SQL, [match], output_field=FloatField()))
+            .order_by('-search_rank', '-created_at')
+        )
+
+    return queryset.filter(
+        Q(name__icontains=text) | Q(company__icontains=text)
+        | Q(location__icontains=text) | Q(description__icontains=text)
+    )
+
+
+def similar_values(queryset, field, text, limit=5):
+    """
+    "Did you mean" suggestions: distinct values of ``field`` that look like ``text``.
+
+    PostgreSQL ranks by pg_trgm similarity through the trigram index on the
+    column; other backends compare the distinct values with difflib.
+    """
+    text = text.strip()
+    if not text:
+        return []
+
+    if connections[queryset.db].vendor == 'postgresql':
+        values = (
+            queryset.filter(**{f'{field}__trigram_similar': text})
+            .annotate(similarity=TrigramSimilarity(field, text))
+            .order_by('-similarity', field)
+            .values_list(field, flat=True)
+            .distinct()
+        )
+        candidates = list(values[:limit + 1])
+    else:
+        values = {value.lower(): value for value in queryset.order_by().values_list(field, flat=True).distinct()}
+        candidates = [values[match] for match in difflib.get_close_matches(text.lower(), values, n=limit + 1)]
+
+    return [value for value in candidates if value.lower() != text.lower()][:limit]
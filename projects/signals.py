@@ -0,0 +1,65 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_project_stats
+from .events import publish_project_changed, publish_work_log_added
+from .models import Project, ProjectDailyStats, WorkLog
+
+
+def apply_daily_stats_delta(project_id, user_id, date, hours, log_count):
+    """Add (or, with negative values, remove) hours and logs on one rollup row."""
+    rows = ProjectDailyStats.objects.filter(project_id=project_id, user_id=user_id, date=date)
+    updated = rows.update(hours=F('hours') + hours, log_count=F('log_count') + log_count)
+    if not updated and log_count > 0:
+        ProjectDailyStats.objects.create(
+            project_id=project_id, user_id=user_id, date=date, hours=hours, log_count=log_count
+        )
+    elif log_count < 0:
+        rows.filter(log_count__lte=0).delete()
+
+
+@receiver(pre_save, sender=WorkLog)
+def remember_previous_work_log(sender, instance, raw=False, **kwargs):
+    instance._previous_stats_key = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_stats_key = (
+        WorkLog.objects.filter(pk=instance.pk)
+        .values_list('project_id', 'user_id', 'date', 'hours_worked')
+        .first()
+    )
+
+
+@receiver(post_save, sender=WorkLog)
+def update_daily_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_stats_key', None)
+    if previous:
+        project_id, user_id, date, hours = previous
+        apply_daily_stats_delta(project_id, user_id, date, -hours, -1)
+        if project_id != instance.project_id:
+            Project.touch(project_id)
+            invalidate_project_stats(project_id)
+            publish_project_changed(project_id)
+    apply_daily_stats_delta(instance.project_id, instance.user_id, instance.date, instance.hours_worked, 1)
+    Project.touch(instance.project_id)
+    invalidate_project_stats(instance.project_id)
+    publish_project_changed(instance.project_id)
+    if created:
+        publish_work_log_added(instance.pk)
+
+
+@receiver(post_delete, sender=WorkLog)
+def update_daily_stats_on_delete(sender, instance, **kwargs):
+    apply_daily_stats_delta(instance.project_id, instance.user_id, instance.date, -instance.hours_worked, -1)
+    Project.touch(instance.project_id)
+    invalidate_project_stats(instance.project_id)
+    publish_project_changed(instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+def announce_project_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        publish_project_changed(instance.pk)
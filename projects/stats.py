@@ -0,0 +1,125 @@
+from datetime import timedelta
+from functools import partial
+
+from django.db import connections, router
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .concurrency import gather_queries
+from .models import ProjectDailyStats
+
+# Whole days between two DATE columns, per database vendor
+DAY_DIFF_SQL = {
+    'postgresql': '{0} - {1}',
+    'sqlite': 'julianday({0}) - julianday({1})',
+}
+
+IDLE_GAPS_SQL = """
+    SELECT previous, date FROM (
+        SELECT date, LAG(date) OVER (ORDER BY date) AS previous
+        FROM (SELECT DISTINCT date FROM {table} WHERE project_id = %s) active_days
+    ) ordered_days
+    WHERE previous IS NOT NULL AND {day_diff} > 1
+    ORDER BY date
+"""
+
+
+def get_idle_gaps(project_id, using=None):
+    """
+    Return the idle ranges between a project's active days.
+
+    The distinct active dates come from ProjectDailyStats and a LAG() window
+    pairs each with the one before it, so only gap rows leave the database.
+    Backends without window functions fall back to diffing the distinct
+    dates in Python. The raw query is sent to the database the router picks
+    for ProjectDailyStats, like the other dashboard queries.
+    """
+    using = using or router.db_for_read(ProjectDailyStats)
+    connection = connections[using]
+    day_diff = DAY_DIFF_SQL.get(connection.vendor)
+    if connection.features.supports_over_clause and day_diff:
+        sql = IDLE_GAPS_SQL.format(
+            table=connection.ops.quote_name(ProjectDailyStats._meta.db_table),
+            day_diff=day_diff.format('date', 'previous'),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [project_id])
+            # SQLite hands DATE columns back as text
+            pairs = [(parse_date(str(previous)), parse_date(str(current))) for previous, current in cursor.fetchall()]
+    else:
+        dates = list(
+            ProjectDailyStats.objects.using(using).filter(project_id=project_id)
+            .order_by('date').values_list('date', flat=True).distinct()
+        )
+        pairs = [(dates[i - 1], dates[i]) for i in range(1, len(dates)) if (dates[i] - dates[i - 1]).days > 1]
+
+    return [{'from': previous + timedelta(days=1),
+             'to': current - timedelta(days=1),
+             'days': (current - previous).days - 1}
+            for previous, current in pairs]
+
+
+def get_totals(project_id):
+    return ProjectDailyStats.objects.filter(project_id=project_id).aggregate(
+        total=Sum('hours'), active_days=Count('date', distinct=True)
+    )
+
+
+def get_workload_by_user(project_id):
+    return list(
+        ProjectDailyStats.objects.filter(project_id=project_id)
+        .values('user__username').annotate(total=Sum('hours')).order_by('user__username')
+    )
+
+
+def get_daily_trend(project_id):
+    return list(
+        ProjectDailyStats.objects.filter(project_id=project_id)
+        .values('date').annotate(total=Sum('hours')).order_by('date')
+    )
+
+
+# Independent queries behind the dashboard, in the order build_project_stats() takes their results
+STATS_QUERIES = (get_totals, get_workload_by_user, get_daily_trend, get_idle_gaps)
+
+
+def build_project_stats(project, totals, workload_by_user, daily_trend, idle_days):
+    total_hours = totals['total'] or 0
+    active_days = totals['active_days']
+    avg_daily_hours = (total_hours / active_days) if active_days else 0
+
+    cumulative = []
+    running_total = 0
+    for d in daily_trend:
+        running_total += float(d['total'])
+        cumulative.append({'date': d['date'], 'cumulative': running_total})
+
+    days_left = (project.completion_date - timezone.now().date()).days if project.completion_date else None
+
+    return {
+        "total_hours": total_hours,
+        "avg_daily_hours": round(avg_daily_hours, 1),
+        "active_days": active_days,
+        "days_left": days_left,
+        "workload_by_user": workload_by_user,
+        "daily_trend": daily_trend,
+        "cumulative": cumulative,
+        "idle_days": idle_days,
+    }
+
+
+def get_project_stats(project):
+    """
+    Dashboard figures for one project, read from the ProjectDailyStats rollup only.
+
+    Returns totals, per-user workload, the daily trend, the cumulative series
+    and idle gaps as plain JSON-serialisable values.
+    """
+    return build_project_stats(project, *(query(project.pk) for query in STATS_QUERIES))
+
+
+async def aget_project_stats(project):
+    """get_project_stats() with its independent queries run concurrently (see gather_queries)."""
+    results = await gather_queries(*(partial(query, project.pk) for query in STATS_QUERIES))
+    return build_project_stats(project, *results)
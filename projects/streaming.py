@@ -0,0 +1,37 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+async def aiter_sync(iterator, batch_size=1):
+    """
+    Pull a sync iterator from async code, ``batch_size`` items per worker-thread hop.
+
+    Every hop runs in the request's thread-sensitive worker, so a database
+    cursor opened by the iterator keeps using the same connection. Each batch
+    goes out as one chunk.
+    """
+    iterator = iter(iterator)
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+    try:
+        while batch := await next_batch():
+            yield batch[0] if len(batch) == 1 else batch[0][:0].join(batch)
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_response(request, content, batch_size=1, **kwargs):
+    """
+    StreamingHttpResponse that really streams under both WSGI and ASGI.
+
+    Given a sync iterator, Django's ASGI handler drains it with
+    ``sync_to_async(list)`` before sending the first byte, so under ASGI it
+    is handed over as an async iterator instead.
+    """
+    if isinstance(request, ASGIRequest):
+        content = aiter_sync(content, batch_size)
+    return StreamingHttpResponse(content, **kwargs)
@@ -1,3 +1,1469 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from xml.etree import ElementTree
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.utils import load_backend
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import metrics
+from .cache import DASHBOARD_CACHE, cached_project_stats, counters, dashboard_key
+from .concurrency import gather_queries
+from .events import BaseBroker, InProcessBroker, get_broker
+from .log_filters import SampleFilter
+from .middleware import ReadYourWritesMiddleware, RoleBasedAccessMiddleware
+from .models import EmailOutbox, FeedbackToken, Project, ProjectDailyStats, WorkLog
+from .outbox import drain_outbox
+from .rollups import rebuild_daily_stats
+from .routers import STICKY_COOKIE, ReplicaRouter, read_from_replica
+from .search import search_projects
+from .stats import aget_project_stats, get_idle_gaps, get_project_stats
+from .views_kanban import ProjectKanbanView
+
+User = get_user_model()
+
+
+def clear_caches():
+    """Start cold: no cached session users, rendered fragments or dashboard stats."""
+    caches['default'].clear()
+    caches[DASHBOARD_CACHE].clear()
+
+
+class ColdCacheMixin:
+    """Clear the caches before every test, so ids reused across rolled-back tests never hit stale entries."""
+
+    def setUp(self):
+        super().setUp()
+        clear_caches()
+
+
+def make_project(user, **kwargs):
+    today = timezone.now().date()
+    defaults = {
+        'name': 'Project',
+        'category': 'Solar',
+        'tender_award_date': today - timedelta(days=30),
+        'completion_date': today + timedelta(days=30),
+        'company': 'Acme',
+        'location': 'Site A',
+        'description': 'Test project',
+    }
+    defaults.update(kwargs)
+    return Project.objects.create(user=user, **defaults)
+
+
+class ProjectTimelineViewTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.client.force_login(self.director)
+
+    def add_projects(self, count):
+        today = timezone.now().date()
+        for i in range(count):
+            project = make_project(self.employee, name=f'Project {i}')
+            WorkLog.objects.create(project=project, user=self.employee, date=today,
+                                   description='Work', hours_worked=Decimal('4.0'))
+            WorkLog.objects.create(project=project, user=self.employee, date=today - timedelta(days=1),
+                                   description='Work', hours_worked=Decimal('2.5'))
+
+    def count_queries(self):
+        clear_caches()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('projects:timeline'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_stats_are_annotated(self):
+        self.add_projects(1)
+        project = Project.objects.get()
+        WorkLog.objects.create(project=project, user=self.director, date=timezone.now().date(),
+                               description='Review', hours_worked=Decimal('1.0'))
+        _, response = self.count_queries()
+        row = response.context['projects'][0]
+        self.assertEqual(row.total_hours, Decimal('7.5'))
+        self.assertEqual(row.active_days, 2)
+        self.assertEqual(row.days_left, 30)
+
+    def test_project_without_logs(self):
+        make_project(self.employee, completion_date=date.today())
+        _, response = self.count_queries()
+        row = response.context['projects'][0]
+        self.assertEqual(row.total_hours, 0)
+        self.assertEqual(row.active_days, 0)
+
+    def test_query_count_is_constant(self):
+        self.add_projects(2)
+        small, _ = self.count_queries()
+        self.add_projects(20)
+        large, _ = self.count_queries()
+        self.assertEqual(small, large)
+
+
+class ProjectKanbanViewTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.client.force_login(self.director)
+
+    def add_projects(self, count):
+        today = timezone.now().date()
+        for i in range(count):
+            make_project(self.employee, name=f'Idle {i}')
+            active = make_project(self.employee, name=f'Active {i}')
+            WorkLog.objects.create(project=active, user=self.employee, date=today,
+                                   description='Work', hours_worked=Decimal('4.0'))
+            make_project(self.employee, name=f'Done {i}', is_submitted=True)
+
+    def get_board(self, **params):
+        clear_caches()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('projects:kanban'), params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_projects_are_split_into_columns(self):
+        self.add_projects(2)
+        _, response = self.get_board()
+        columns = {column['key']: column for column in response.context['columns']}
+        self.assertEqual(columns['not_started']['count'], 2)
+        self.assertEqual(columns['in_progress']['count'], 2)
+        self.assertEqual(columns['completed']['count'], 2)
+        self.assertTrue(all(p.name.startswith('Active') for p in columns['in_progress']['cards']))
+
+    def test_query_count_is_constant(self):
+        self.add_projects(2)
+        small, _ = self.get_board()
+        self.add_projects(25)
+        large, response = self.get_board()
+        self.assertEqual(small, large)
+        columns = {column['key']: column for column in response.context['columns']}
+        self.assertEqual(len(columns['completed']['cards']), ProjectKanbanView.cards_per_column)
+        self.assertTrue(columns['completed']['has_next'])
+
+    def test_column_page_is_served_as_json(self):
+        self.add_projects(25)
+        response = self.client.get(reverse('projects:kanban'), {'column': 'in_progress', 'page': 2},
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = response.json()
+        self.assertEqual(data['status'], 'success')
+        self.assertFalse(data['has_next'])
+        self.assertEqual(data['html'].count('kanban-card'), 5)
+
+
+class ProjectListViewTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.client.force_login(self.director)
+
+    def add_projects(self, count):
+        today = timezone.now().date()
+        for i in range(count):
+            project = make_project(self.employee, name=f'Project {i}')
+            WorkLog.objects.create(project=project, user=self.employee, date=today - timedelta(days=3),
+                                   description='Work', hours_worked=Decimal('4.0'))
+            WorkLog.objects.create(project=project, user=self.employee, date=today,
+                                   description='Work', hours_worked=Decimal('1.5'))
+
+    def test_rows_carry_work_log_stats(self):
+        self.add_projects(1)
+        response = self.client.get(reverse('projects:list'))
+        row = response.context['projects'][0]
+        self.assertEqual(row.log_count, 2)
+        self.assertEqual(row.total_hours, Decimal('5.5'))
+        self.assertEqual(row.last_log_date, timezone.now().date())
+
+    def test_keyset_pages_cover_every_project_once(self):
+        self.add_projects(25)
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(reverse('projects:list'), {'cursor': cursor})
+            seen.extend(project.pk for project in response.context['projects'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(Project.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_keyset_page_query_count_does_not_depend_on_depth(self):
+        self.add_projects(25)
+        url = reverse('projects:list')
+        with CaptureQueriesContext(connection) as page_one:
+            response = self.client.get(url, {'cursor': ''})
+        response = self.client.get(url, {'cursor': response.context['next_cursor']})
+        with CaptureQueriesContext(connection) as page_three:
+            self.client.get(url, {'cursor': response.context['next_cursor']})
+        self.assertEqual(len(page_one), len(page_three))
+
+
+class ProjectDailyStatsTests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        self.project = make_project(self.employee)
+        self.today = timezone.now().date()
+
+    def log(self, user, day, hours):
+        return WorkLog.objects.create(project=self.project, user=user, date=day,
+                                      description='Work', hours_worked=Decimal(hours))
+
+    def rollup(self):
+        return {(s.user_id, s.date): (s.hours, s.log_count) for s in ProjectDailyStats.objects.all()}
+
+    def test_rollup_follows_create_update_and_delete(self):
+        log = self.log(self.employee, self.today, '3.0')
+        self.log(self.other, self.today, '2.0')
+        self.assertEqual(self.rollup(), {
+            (self.employee.pk, self.today): (Decimal('3.0'), 1),
+            (self.other.pk, self.today): (Decimal('2.0'), 1),
+        })
+
+        yesterday = self.today - timedelta(days=1)
+        log.date = yesterday
+        log.hours_worked = Decimal('5.5')
+        log.save()
+        self.assertEqual(self.rollup(), {
+            (self.employee.pk, yesterday): (Decimal('5.5'), 1),
+            (self.other.pk, self.today): (Decimal('2.0'), 1),
+        })
+
+        log.delete()
+        self.assertEqual(self.rollup(), {(self.other.pk, self.today): (Decimal('2.0'), 1)})
+
+    def test_rebuild_command_restores_rollups(self):
+        self.log(self.employee, self.today, '3.0')
+        self.log(self.employee, self.today - timedelta(days=2), '1.5')
+        expected = self.rollup()
+        ProjectDailyStats.objects.all().delete()
+
+        call_command('rebuild_daily_stats', '--backfill', stdout=StringIO())
+        self.assertEqual(self.rollup(), expected)
+        call_command('rebuild_daily_stats', '--project', str(self.project.pk), stdout=StringIO())
+        self.assertEqual(self.rollup(), expected)
+
+    def test_dashboard_reads_rollups(self):
+        self.log(self.employee, self.today, '3.0')
+        self.log(self.other, self.today, '2.0')
+        self.log(self.employee, self.today - timedelta(days=3), '1.0')
+        self.client.force_login(self.employee)
+        response = self.client.get(reverse('projects:project_dashboard', args=[self.project.pk]))
+        self.assertEqual(response.context['total_hours'], Decimal('6.0'))
+        self.assertEqual(response.context['active_days'], 2)
+        self.assertEqual(response.context['cumulative'][-1]['cumulative'], 6.0)
+        self.assertEqual(response.context['idle_days'], [{
+            'from': self.today - timedelta(days=2),
+            'to': self.today - timedelta(days=1),
+            'days': 2,
+        }])
+
+    def test_idle_gaps_window_matches_fallback(self):
+        for offset in (0, 1, 4, 5, 9):
+            self.log(self.employee, self.today - timedelta(days=offset), '1.0')
+        for offset in (0, 4, 12):
+            self.log(self.other, self.today - timedelta(days=offset), '1.0')
+
+        gaps = get_idle_gaps(self.project.pk)
+        with mock.patch.object(connection.features, 'supports_over_clause', False):
+            self.assertEqual(get_idle_gaps(self.project.pk), gaps)
+        self.assertEqual([gap['days'] for gap in gaps], [2, 3, 2])
+        self.assertEqual(gaps[0]['from'], self.today - timedelta(days=11))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BACKOFF=60)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee, client_email='client@example.com')
+        self.client.force_login(self.employee)
+
+    def test_feedback_request_is_queued_not_sent(self):
+        response = self.client.post(reverse('projects:send_feedback', args=[self.project.pk]))
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(len(mail.outbox), 0)
+
+        queued = EmailOutbox.objects.get()
+        token = FeedbackToken.objects.get()
+        self.assertIn(str(token.token), queued.body)
+        self.assertEqual(queued.to, 'client@example.com')
+
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['client@example.com'])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'sent')
+        self.assertEqual(queued.attempts, 1)
+
+    def test_failures_back_off_then_give_up(self):
+        self.client.post(reverse('projects:send_feedback', args=[self.project.pk]))
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')), \
+                self.assertLogs('projects.outbox', level='WARNING'):
+            self.assertEqual(drain_outbox(), (1, 0))
+            queued = EmailOutbox.objects.get()
+            self.assertEqual((queued.status, queued.attempts), ('pending', 1))
+            self.assertGreater(queued.next_attempt_at, timezone.now())
+
+            # Not due yet, so nothing is claimed
+            self.assertEqual(drain_outbox(), (0, 0))
+
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            drain_outbox()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.last_error), ('failed', 2, 'SMTP down'))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class FeedbackCampaignTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        for i in range(5):
+            make_project(self.employee, name=f'Done {i}', is_submitted=True, client_email=f'client{i}@example.com')
+        make_project(self.employee, name='Draft', client_email='draft@example.com')
+        make_project(self.employee, name='No email', is_submitted=True)
+
+    def post_campaign(self, body):
+        return self.client.post(reverse('projects:feedback_campaign'), data=json.dumps(body),
+                                content_type='application/json')
+
+    def all_ids(self):
+        return list(Project.objects.values_list('pk', flat=True))
+
+    def test_campaign_streams_progress_and_queues_in_chunks(self):
+        self.client.force_login(self.director)
+        with mock.patch('projects.views.FeedbackCampaignView.chunk_size', 2):
+            response = self.post_campaign({'project_ids': self.all_ids()})
+            steps = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([step['queued'] for step in steps], [2, 4, 5])
+        self.assertEqual(steps[-1], {'total': 5, 'queued': 5})
+        self.assertEqual(FeedbackToken.objects.count(), 5)
+        # Nothing goes out over SMTP inside the request; the outbox worker sends it
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(drain_outbox(), (5, 5))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f'client{i}@example.com' for i in range(5)])
+        token = FeedbackToken.objects.get(project__name='Done 0')
+        self.assertIn(str(token.token), next(m.body for m in mail.outbox if m.to == ['client0@example.com']))
+
+    def test_campaign_limited_to_selected_projects(self):
+        self.client.force_login(self.director)
+        ids = list(Project.objects.filter(name__in=['Done 1', 'Draft']).values_list('pk', flat=True))
+        response = self.post_campaign({'project_ids': ids})
+        steps = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(steps[-1]['total'], 1)
+        self.assertEqual(list(EmailOutbox.objects.values_list('to', flat=True)), ['client1@example.com'])
+
+    def test_campaign_requires_project_ids(self):
+        self.client.force_login(self.director)
+        for body in ({}, {'project_ids': []}, {'project_ids': 'all'}, {'project_ids': ['1']}, []):
+            self.assertEqual(self.post_campaign(body).status_code, 400)
+        self.assertEqual(FeedbackToken.objects.count(), 0)
+        self.assertEqual(EmailOutbox.objects.count(), 0)
+
+    def test_campaign_skips_clients_with_an_outstanding_token(self):
+        self.client.force_login(self.director)
+        pending = Project.objects.get(name='Done 0')
+        FeedbackToken.objects.create(project=pending)
+        FeedbackToken.objects.create(project=Project.objects.get(name='Done 1'), expires_at=timezone.now())
+        FeedbackToken.objects.create(project=Project.objects.get(name='Done 2'), used=True)
+        response = self.post_campaign({'project_ids': self.all_ids()})
+        steps = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(steps[-1], {'total': 4, 'queued': 4})
+        self.assertNotIn('client0@example.com', EmailOutbox.objects.values_list('to', flat=True))
+
+        # Running it again finds everyone already waiting on a link
+        response = self.post_campaign({'project_ids': self.all_ids()})
+        steps = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(steps, [{'total': 0, 'queued': 0}])
+
+    def test_campaign_email_is_not_html_escaped(self):
+        self.client.force_login(self.director)
+        project = make_project(self.employee, name='R&D "Phase" <2>', company="O'Neil & Sons",
+                               is_submitted=True, client_email='rd@example.com')
+        b''.join(self.post_campaign({'project_ids': [project.pk]}).streaming_content)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.subject, 'Feedback request for project: R&D "Phase" <2>')
+        self.assertIn('O\'Neil & Sons has completed the project "R&D "Phase" <2>"', email.body)
+
+        body = render_to_string('projects/emails/feedback_request.txt',
+                                {'project': project, 'feedback_url': 'https://example.com/f/?a=1&b=2'})
+        self.assertIn('https://example.com/f/?a=1&b=2', body)
+
+    async def test_asgi_campaign_streams_each_step(self):
+        await self.async_client.aforce_login(self.director)
+        ids = [pk async for pk in Project.objects.values_list('pk', flat=True)]
+        with mock.patch('projects.views.FeedbackCampaignView.chunk_size', 2):
+            response = await self.async_client.post(reverse('projects:feedback_campaign'),
+                                                    data=json.dumps({'project_ids': ids}),
+                                                    content_type='application/json')
+            self.assertTrue(response.is_async)
+            steps = [json.loads(chunk) async for chunk in response.streaming_content]
+        self.assertEqual([step['queued'] for step in steps], [2, 4, 5])
+
+    def test_campaign_is_director_only(self):
+        self.client.force_login(self.employee)
+        self.assertEqual(self.post_campaign({'project_ids': self.all_ids()}).status_code, 403)
+        self.assertEqual(FeedbackToken.objects.count(), 0)
+
+
+class ClientFeedbackTokenTests(TestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee, is_submitted=True, client_email='client@example.com')
+        self.token = FeedbackToken.objects.create(project=self.project)
+        self.url = reverse('projects:client_feedback_token', args=[self.token.token])
+
+    def submit(self, feedback='Great work'):
+        return self.client.post(self.url, {'client_feedback': feedback, 'client_confirmed_completed': 'on'})
+
+    def test_form_loads_token_and_project_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['project'], self.project)
+
+    def test_token_is_consumed_once(self):
+        self.assertRedirects(self.submit(), reverse('projects:feedback_thank_you'))
+        self.token.refresh_from_db()
+        self.assertTrue(self.token.used)
+        self.assertLessEqual(self.token.expires_at, timezone.now())
+
+        response = self.submit('Second try')
+        self.assertTemplateUsed(response, 'projects/feedback_expired.html')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.client_feedback, 'Great work')
+
+    def test_concurrent_submits_have_one_winner(self):
+        # Both requests loaded the token before either consumed it
+        first, second = FeedbackToken.objects.get(), FeedbackToken.objects.get()
+        with self.assertNumQueries(1):
+            self.assertTrue(first.consume())
+        self.assertFalse(second.consume())
+
+    def test_expired_token_is_refused(self):
+        FeedbackToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTemplateUsed(self.client.get(self.url), 'projects/feedback_expired.html')
+        self.assertTemplateUsed(self.submit(), 'projects/feedback_expired.html')
+        self.assertFalse(FeedbackToken.objects.get().used)
+
+    def test_purge_deletes_used_and_expired_tokens_in_chunks(self):
+        self.token.consume()
+        FeedbackToken.objects.bulk_create(
+            [FeedbackToken(project=self.project, expires_at=timezone.now() - timedelta(days=1)) for _ in range(4)]
+        )
+        fresh = FeedbackToken.objects.create(project=self.project)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('purge_feedback_tokens', '--chunk-size', '2', stdout=out)
+        self.assertIn('Deleted 5 feedback tokens', out.getvalue())
+        self.assertEqual(list(FeedbackToken.objects.all()), [fresh])
+        deletes = [query for query in ctx.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+
+
+class ProjectSearchTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.client.force_login(self.director)
+        make_project(self.employee, name='Solar farm', company='Sunrise Energy', location='Jaipur',
+                     description='Ground mounted panels')
+        make_project(self.employee, name='Hospital wing', company='Metro Builders', location='Pune',
+                     description='Rooftop solar for the new wing')
+        make_project(self.employee, name='Bridge repair', company='Metro Builders', location='Delhi',
+                     description='Structural work')
+
+    def search(self, text):
+        response = self.client.get(reverse('projects:list'), {'search': text})
+        return [project.name for project in response.context['projects']]
+
+    def test_search_ranks_name_matches_first(self):
+        self.assertEqual(self.search('solar'), ['Solar farm', 'Hospital wing'])
+
+    def test_search_matches_prefixes_across_fields(self):
+        self.assertEqual(self.search('metro deh'), [])
+        self.assertEqual(self.search('metro del'), ['Bridge repair'])
+
+    def test_index_follows_updates_and_deletes(self):
+        project = Project.objects.get(name='Bridge repair')
+        project.location = 'Chennai'
+        project.save()
+        self.assertEqual(self.search('chennai'), ['Bridge repair'])
+        self.assertEqual(self.search('delhi'), [])
+        project.delete()
+        self.assertEqual(self.search('chennai'), [])
+
+    def test_misspelled_company_suggests_close_matches(self):
+        response = self.client.get(reverse('projects:list'), {'company': 'Metro Bulders'})
+        self.assertEqual(list(response.context['projects']), [])
+        self.assertEqual(response.context['suggestions'], {'company': ['Metro Builders']})
+        self.assertContains(response, 'Did you mean company')
+
+    def test_company_filter_is_substring_match(self):
+        response = self.client.get(reverse('projects:list'), {'company': 'builders'})
+        self.assertEqual(len(response.context['projects']), 2)
+        self.assertNotIn('suggestions', response.context)
+
+
+class HotQueryPlanTests(TestCase):
+    """Fails when a hot query stops using an index and falls back to a full table scan."""
+
+    def setUp(self):
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee)
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would always be seq-scanned; make the planner show its index choice
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset):
+        table = queryset.model._meta.db_table
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            full_scan = re.search(rf'Seq Scan on {table}\b', plan)
+        else:
+            full_scan = re.search(rf'SCAN {table}\b(?! USING (COVERING )?INDEX)', plan)
+        self.assertIsNone(full_scan, f'Full table scan in plan:\n{plan}')
+
+    def test_project_queries(self):
+        self.assertUsesIndex(Project.objects.filter(user=self.employee).order_by('-created_at'))
+        self.assertUsesIndex(Project.objects.order_by('-created_at', '-id')[:10])
+
+    def test_work_log_queries(self):
+        self.assertUsesIndex(WorkLog.objects.filter(project=self.project).order_by('-date', '-created_at'))
+        self.assertUsesIndex(ProjectDailyStats.objects.filter(project=self.project).values('date').distinct())
+
+    @skipUnless(connection.vendor == 'postgresql', 'INCLUDE columns only exist on PostgreSQL')
+    def test_covering_indexes_answer_without_the_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_bitmapscan = off')
+        for queryset, index in (
+            (WorkLog.objects.filter(project=self.project).values('date', 'created_at', 'hours_worked'),
+             'worklog_project_date_idx'),
+            (ProjectDailyStats.objects.filter(project=self.project).values('date', 'hours'),
+             'dailystats_project_date_idx'),
+        ):
+            plan = queryset.explain()
+            self.assertIn(f'Index Only Scan using {index}', plan)
+
+    def test_feedback_token_queries(self):
+        self.assertUsesIndex(FeedbackToken.objects.filter(project=self.project, used=False))
+        self.assertUsesIndex(FeedbackToken.objects.filter(used=False).order_by('created_at'))
+        self.assertUsesIndex(FeedbackToken.objects.filter(expires_at__lt=timezone.now()))
+
+
+class WorkLogImportTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee)
+        self.other_project = make_project(self.director, name='Not yours')
+        self.today = timezone.now().date()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), name)
+        with open(path, 'w', newline='') as handle:
+            handle.write(content)
+        return path
+
+    def test_command_imports_csv_in_batches(self):
+        day = self.today - timedelta(days=1)
+        WorkLog.objects.create(project=self.project, user=self.employee, date=day,
+                               description='Existing', hours_worked=Decimal('1.0'))
+        path = self.write_file('logs.csv', (
+            'project_id,username,date,description,hours_worked\n'
+            f'{self.project.pk},employee,{self.today},Imported,3.5\n'
+            f'{self.project.pk},employee,{day},Replaces existing,2.0\n'
+            f'{self.project.pk},employee,{self.today + timedelta(days=1)},Future,1.0\n'
+            f'{self.project.pk},nobody,{self.today},Unknown user,1.0\n'
+            f'999,employee,{self.today},Unknown project,1.0\n'
+        ))
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_work_logs', path, '--on-conflict', 'update', '--batch-size', '2',
+                     stdout=stdout, stderr=stderr)
+
+        self.assertIn('Read 5 rows: 2 accepted, 3 rejected', stdout.getvalue())
+        self.assertEqual(stderr.getvalue().count('line '), 3)
+        self.assertEqual(
+            dict(WorkLog.objects.values_list('description', 'hours_worked')),
+            {'Imported': Decimal('3.5'), 'Replaces existing': Decimal('2.0')},
+        )
+        self.assertEqual(ProjectDailyStats.objects.filter(project=self.project).aggregate(Sum('hours'))['hours__sum'],
+                         Decimal('5.5'))
+
+    def test_upload_jsonl_reports_row_errors(self):
+        self.client.force_login(self.employee)
+        rows = [
+            {'project_id': self.project.pk, 'date': str(self.today), 'description': 'Mine', 'hours_worked': '4'},
+            {'project_id': self.project.pk, 'date': str(self.today), 'description': 'Again', 'hours_worked': '4'},
+            {'project_id': self.other_project.pk, 'date': str(self.today), 'description': 'Theirs',
+             'hours_worked': '4'},
+            {'project_id': self.project.pk, 'username': 'director', 'date': str(self.today),
+             'description': 'Someone else', 'hours_worked': '4'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n'
+        upload = SimpleUploadedFile('logs.jsonl', content.encode())
+        data = self.client.post(reverse('projects:import_work_logs'), {'file': upload}).json()
+
+        self.assertEqual(data['summary'], {'rows': 5, 'accepted': 1, 'errors': 4})
+        self.assertEqual([error['line'] for error in data['errors']], [2, 3, 4, 5])
+        log = WorkLog.objects.get()
+        self.assertEqual((log.user, log.description), (self.employee, 'Mine'))
+
+    def test_existing_logs_are_reported_per_row_when_skipping(self):
+        WorkLog.objects.create(project=self.project, user=self.employee, date=self.today,
+                               description='Existing', hours_worked=Decimal('1.0'))
+        self.client.force_login(self.employee)
+        content = (
+            'project_id,date,description,hours_worked\n'
+            f'{self.project.pk},{self.today - timedelta(days=1)},New,2.0\n'
+            f'{self.project.pk},{self.today},Clashes,3.0\n'
+        )
+        upload = SimpleUploadedFile('logs.csv', content.encode())
+        data = self.client.post(reverse('projects:import_work_logs'), {'file': upload}).json()
+
+        self.assertEqual(data['summary'], {'rows': 2, 'accepted': 1, 'errors': 1})
+        self.assertEqual([error['line'] for error in data['errors']], [3])
+        self.assertEqual(WorkLog.objects.get(date=self.today).description, 'Existing')
+
+    def test_unknown_conflict_mode_is_a_bad_request(self):
+        self.client.force_login(self.employee)
+        upload = SimpleUploadedFile('logs.csv', b'project_id,date,description,hours_worked\n')
+        response = self.client.post(reverse('projects:import_work_logs'), {'file': upload, 'on_conflict': 'overwrite'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('on_conflict', response.json()['message'])
+
+    def test_unreadable_upload_is_a_bad_request(self):
+        self.client.force_login(self.employee)
+        header = 'project_id,date,description,hours_worked\n'.encode()
+        for content, message in (
+            (header + 'x,y,caf\xe9,1\n'.encode('latin-1'), 'not UTF-8'),
+            (header + b'1,2,' + b'x' * (csv.field_size_limit() + 1) + b',1\n', 'not valid CSV'),
+        ):
+            upload = SimpleUploadedFile('logs.csv', content)
+            response = self.client.post(reverse('projects:import_work_logs'), {'file': upload})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(message, response.json()['message'])
+            self.assertEqual(response.json()['summary']['accepted'], 0)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        self.project = make_project(self.employee, name='Solar, phase 1', company='Sunrise')
+        make_project(self.employee, name='Bridge', company='Metro')
+        make_project(self.other, name='Not mine', company='Metro')
+        WorkLog.objects.create(project=self.project, user=self.employee, date=timezone.now().date(),
+                               description='Line one\nline two', hours_worked=Decimal('6.5'))
+
+    def download(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_project_csv_respects_scope_and_filters(self):
+        self.client.force_login(self.employee)
+        rows = list(csv.reader(StringIO(self.download(reverse('projects:export', args=['csv'])).decode())))
+        self.assertEqual(rows[0][:3], ['ID', 'Name', 'Category'])
+        self.assertEqual(sorted(row[1] for row in rows[1:]), ['Bridge', 'Solar, phase 1'])
+
+        self.client.force_login(self.director)
+        rows = list(csv.reader(StringIO(
+            self.download(reverse('projects:export', args=['csv']), {'company': 'metro'}).decode()
+        )))
+        self.assertEqual(sorted(row[1] for row in rows[1:]), ['Bridge', 'Not mine'])
+
+    def test_work_log_xlsx_is_a_valid_workbook(self):
+        self.client.force_login(self.employee)
+        content = self.download(reverse('projects:export_work_logs', args=[self.project.pk, 'xlsx']))
+        with zipfile.ZipFile(BytesIO(content)) as workbook:
+            self.assertIn('xl/workbook.xml', workbook.namelist())
+            sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+        namespace = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        rows = sheet.findall('.//s:row', namespace)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1].findall('s:c', namespace)[2].find('s:v', namespace).text, '6.5')
+        self.assertIn('Line one', ''.join(rows[1].itertext()))
+
+    async def test_asgi_export_streams_in_batches(self):
+        await self.async_client.aforce_login(self.director)
+        with mock.patch('projects.exports.CSV_ROWS_PER_CHUNK', 2):
+            response = await self.async_client.get(reverse('projects:export', args=['csv']))
+            # An async iterator, so ASGI does not buffer the whole file first
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        rows = list(csv.reader(StringIO(b''.join(chunks).decode())))
+        self.assertEqual(rows[0][:3], ['ID', 'Name', 'Category'])
+        self.assertEqual(sorted(row[1] for row in rows[1:]), ['Bridge', 'Not mine', 'Solar, phase 1'])
+
+    def test_work_log_export_requires_access(self):
+        self.client.force_login(self.other)
+        response = self.client.get(reverse('projects:export_work_logs', args=[self.project.pk, 'csv']))
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse('projects:export', args=['pdf']))
+        self.assertEqual(response.status_code, 404)
+
+
+class JSONAPITests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        self.projects = [make_project(self.employee, name=f'Mine {i}') for i in range(5)]
+        self.foreign = make_project(self.other, name='Theirs')
+        today = timezone.now().date()
+        for offset in range(3):
+            WorkLog.objects.create(project=self.projects[0], user=self.employee, date=today - timedelta(days=offset),
+                                   description='Work', hours_worked=Decimal('2.0'))
+
+    def test_project_list_is_scoped_paginated_and_sparse(self):
+        self.client.force_login(self.employee)
+        url = reverse('projects:api_projects')
+        names, cursor = [], None
+        while True:
+            params = {'fields': 'name', 'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            self.assertTrue(all(list(row) == ['name'] for row in data['results']))
+            names.extend(row['name'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(names), [f'Mine {i}' for i in range(5)])
+
+    def test_sparse_fields_limit_selected_columns(self):
+        self.client.force_login(self.director)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('projects:api_projects'), {'fields': 'id,name'})
+        sql = next(q['sql'] for q in ctx.captured_queries if 'projects_project' in q['sql'])
+        self.assertNotIn('description', sql)
+        self.assertEqual(self.client.get(reverse('projects:api_projects'), {'fields': 'password'}).status_code, 400)
+
+    def test_detail_work_logs_and_stats(self):
+        self.client.force_login(self.employee)
+        project = self.projects[0]
+        detail = self.client.get(reverse('projects:api_project', args=[project.pk]), {'fields': 'name,owner'}).json()
+        self.assertEqual(detail, {'name': 'Mine 0', 'owner': 'employee'})
+
+        logs = self.client.get(reverse('projects:api_work_logs', args=[project.pk])).json()
+        self.assertEqual(len(logs['results']), 3)
+        self.assertEqual(logs['results'][0]['username'], 'employee')
+
+        stats = self.client.get(reverse('projects:api_project_stats', args=[project.pk])).json()
+        self.assertEqual((Decimal(stats['total_hours']), stats['active_days']), (Decimal('6'), 3))
+
+    def test_other_users_projects_are_hidden(self):
+        self.client.force_login(self.employee)
+        for name in ('projects:api_project', 'projects:api_work_logs', 'projects:api_project_stats'):
+            self.assertEqual(self.client.get(reverse(name, args=[self.foreign.pk])).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('projects:api_projects')).status_code, 403)
+
+
+class ConditionalGetTests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        self.project = make_project(self.employee)
+        self.urls = [
+            reverse('projects:detail', args=[self.project.pk]),
+            reverse('projects:project_dashboard', args=[self.project.pk]),
+            reverse('projects:api_project', args=[self.project.pk]),
+            reverse('projects:api_work_logs', args=[self.project.pk]),
+            reverse('projects:api_project_stats', args=[self.project.pk]),
+        ]
+
+    def add_log(self):
+        return WorkLog.objects.create(project=self.project, user=self.employee, date=timezone.now().date(),
+                                      description='Work', hours_worked=Decimal('2.0'))
+
+    def test_unchanged_project_answers_304_with_one_query(self):
+        self.client.force_login(self.employee)
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertTrue(response.has_header('Last-Modified'))
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304, url)
+            # Session and user lookups from the auth middleware, plus the project lookup
+            project_queries = [q['sql'] for q in ctx.captured_queries if 'projects_' in q['sql']]
+            self.assertEqual(len(project_queries), 1, project_queries)
+
+    def test_version_bumps_on_project_and_work_log_changes(self):
+        self.assertEqual(self.project.version, 1)
+        self.project.name = 'Renamed'
+        self.project.save()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, 2)
+        log = self.add_log()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, 3)
+        log.delete()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, 4)
+
+    def test_save_after_a_touch_keeps_both_bumps(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        self.add_log()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, 2)
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(stale.version, 3)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, 3)
+
+    def test_work_log_change_invalidates_etag(self):
+        self.client.force_login(self.employee)
+        url = reverse('projects:project_dashboard', args=[self.project.pk])
+        etag = self.client.get(url)['ETag']
+        self.add_log()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_not_shared_across_users_and_skips_forbidden_projects(self):
+        self.client.force_login(self.employee)
+        url = reverse('projects:detail', args=[self.project.pk])
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.other)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_new_login_or_csrf_token_gets_a_fresh_page(self):
+        self.client.force_login(self.employee)
+        url = reverse('projects:detail', args=[self.project.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'a' * 32
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        # Logging in again starts a new session, and with it a new token
+        self.client.logout()
+        self.client.force_login(self.employee)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_search_index_survives_version_migration(self):
+        make_project(self.employee, name='Windfarm upgrade')
+        results = search_projects(Project.objects.all(), 'windfarm')
+        self.assertEqual([project.name for project in results], ['Windfarm upgrade'])
+
+
+class DashboardCacheTests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee)
+        WorkLog.objects.create(project=self.project, user=self.employee, date=timezone.now().date(),
+                               description='Work', hours_worked=Decimal('2.0'))
+        self.url = reverse('projects:project_dashboard', args=[self.project.pk])
+        self.client.force_login(self.employee)
+
+    def stats_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries if 'projects_projectdailystats' in q['sql']]
+
+    def test_second_render_is_served_from_cache(self):
+        hits, misses = counters['dashboard_hit'], counters['dashboard_miss']
+        self.assertTrue(self.stats_queries())
+        self.assertEqual(self.stats_queries(), [])
+        self.assertEqual(counters['dashboard_hit'] - hits, 1)
+        self.assertEqual(counters['dashboard_miss'] - misses, 1)
+
+    def test_work_log_changes_invalidate_the_entry(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(caches[DASHBOARD_CACHE].get(dashboard_key(self.project.pk)))
+        log = WorkLog.objects.create(project=self.project, user=self.employee,
+                                     date=timezone.now().date() - timedelta(days=1),
+                                     description='More', hours_worked=Decimal('3.0'))
+        self.assertIsNone(caches[DASHBOARD_CACHE].get(dashboard_key(self.project.pk)))
+        self.assertEqual(self.client.get(self.url).context['total_hours'], Decimal('5'))
+        log.delete()
+        self.assertEqual(self.client.get(self.url).context['total_hours'], Decimal('2'))
+
+    def test_file_based_backend_is_size_bounded(self):
+        projects = [make_project(self.employee, name=f'P{i}') for i in range(5)]
+        with tempfile.TemporaryDirectory() as location:
+            dashboard = {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+                'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 1},
+            }
+            with override_settings(CACHES={**settings.CACHES, DASHBOARD_CACHE: dashboard}):
+                for project in projects:
+                    cached_project_stats(project)
+                self.assertLessEqual(len(os.listdir(location)), 2)
+                hits = counters['dashboard_hit']
+                cached_project_stats(projects[-1])
+                self.assertEqual(counters['dashboard_hit'] - hits, 1)
+
+
+class FragmentCacheTests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.projects = [make_project(self.employee, name=f'Card {i}') for i in range(5)]
+
+    def render(self, url):
+        hits, misses = counters['fragment_hit'], counters['fragment_miss']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, counters['fragment_hit'] - hits, counters['fragment_miss'] - misses
+
+    def test_kanban_board_is_served_from_cache_with_one_lookup(self):
+        self.client.force_login(self.employee)
+        url = reverse('projects:kanban')
+        self.assertEqual(self.render(url)[1:], (0, 5))
+        with mock.patch.object(caches['default'], 'get_many', wraps=caches['default'].get_many) as get_many:
+            response, hits, misses = self.render(url)
+        self.assertEqual((hits, misses), (5, 0))
+        self.assertEqual(get_many.call_count, 1)
+        self.assertContains(response, 'Card 4')
+
+    def test_changed_project_is_rerendered(self):
+        self.client.force_login(self.employee)
+        url = reverse('projects:list')
+        self.render(url)
+        project = self.projects[0]
+        project.name = 'Renamed card'
+        project.save()
+        response, hits, misses = self.render(url)
+        self.assertEqual((hits, misses), (4, 1))
+        self.assertContains(response, 'Renamed card')
+        self.assertNotContains(response, 'Card 0')
+
+    def test_owner_and_other_users_get_separate_fragments(self):
+        director = User.objects.create_user('director', password='pass', user_type='director')
+        edit_url = reverse('projects:update', args=[self.projects[0].pk])
+        self.client.force_login(self.employee)
+        self.assertContains(self.client.get(reverse('projects:list')), edit_url)
+        self.client.force_login(director)
+        self.assertNotContains(self.client.get(reverse('projects:list')), edit_url)
+
+
+class RoleBasedAccessMiddlewareTests(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director',
+                                                 is_staff=True, is_superuser=True)
+        self.employee = User.objects.create_user('employee', password='pass', is_staff=True)
+
+    def test_directors_cannot_create_projects(self):
+        self.client.force_login(self.director)
+        self.assertRedirects(self.client.get(reverse('projects:create')), reverse('projects:list'))
+        self.client.force_login(self.employee)
+        self.assertEqual(self.client.get(reverse('projects:create')).status_code, 200)
+
+    def test_fresh_superuser_can_reach_the_admin(self):
+        # createsuperuser leaves user_type at "employee"; the admin is where it gets changed
+        superuser = User.objects.create_superuser('root', 'root@example.com', 'pass')
+        self.client.force_login(superuser)
+        self.assertEqual(self.client.get(reverse('admin:index')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('admin:users_user_changelist')).status_code, 200)
+
+    def test_unrestricted_views_do_not_load_the_user(self):
+        middleware = RoleBasedAccessMiddleware(lambda request: None)
+        request = RequestFactory().get(reverse('projects:list'))
+        request.resolver_match = resolve(request.path)
+        # Accessing request.user would raise AttributeError here
+        self.assertIsNone(middleware.process_view(request, request.resolver_match.func, (), {}))
+        static_request = RequestFactory().get('/static/css/site.css')
+        self.assertIsNone(middleware.process_view(static_request, None, (), {}))
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        make_project(self.employee)
+
+    def test_metrics_endpoint_reports_per_view_histograms(self):
+        self.client.force_login(self.employee)
+        self.client.get(reverse('projects:list'))
+        self.client.get(reverse('projects:list'))
+        self.client.force_login(self.director)
+        response = self.client.get(reverse('projects:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('projects_request_duration_seconds_count{view="projects:list"} 2', body)
+        self.assertIn('projects_db_queries_bucket{view="projects:list",le="+Inf"} 2', body)
+        rendered = re.search(r'projects_template_render_seconds_sum\{view="projects:list"\} (\S+)', body)
+        self.assertGreater(float(rendered.group(1)), 0)
+        queries = re.search(r'projects_db_queries_sum\{view="projects:list"\} (\S+)', body)
+        self.assertGreater(int(queries.group(1)), 0)
+
+    def test_metrics_endpoint_is_director_only(self):
+        self.client.force_login(self.employee)
+        self.assertEqual(self.client.get(reverse('projects:metrics')).status_code, 403)
+
+    def test_sample_filter_only_drops_low_level_records(self):
+        sampler = SampleFilter(rate=0)
+        debug = logging.LogRecord('projects', logging.DEBUG, __file__, 1, 'trace', None, None)
+        warning = logging.LogRecord('projects', logging.WARNING, __file__, 1, 'problem', None, None)
+        self.assertFalse(sampler.filter(debug))
+        self.assertTrue(sampler.filter(warning))
+
+
+class QueryCountRegressionTests(TestCase):
+    """
+    Each page must run as many queries for 500 projects (and work logs) as for a handful.
+
+    The small size stays below the list and kanban page sizes, so a per-row
+    query shows up as a difference rather than being hidden by pagination.
+    """
+    sizes = (3, 500)
+
+    def setUp(self):
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.projects = []
+
+    def grow_to(self, size):
+        """Top the fixture up to ``size`` projects; the first project gets ``size`` work logs."""
+        today = timezone.now().date()
+        self.projects += Project.objects.bulk_create(
+            Project(user=self.employee, name=f'Project {i}', category='Solar', company=f'Company {i % 7}',
+                    location='Site', description='Seeded', tender_award_date=today - timedelta(days=30),
+                    completion_date=today + timedelta(days=i % 60), is_submitted=i % 3 == 0)
+            for i in range(len(self.projects), size)
+        )
+        first = self.projects[0]
+        existing = first.work_logs.count()
+        WorkLog.objects.bulk_create(
+            WorkLog(project=first, user=self.employee, date=today - timedelta(days=day + 1),
+                    description='Seeded', hours_worked=Decimal('1.5'))
+            for day in range(existing, size)
+        )
+        WorkLog.objects.bulk_create(
+            [WorkLog(project=project, user=self.employee, date=today - timedelta(days=1),
+                     description='Seeded', hours_worked=Decimal('2.0'))
+             for project in self.projects[1:] if project.pk % 2],
+            ignore_conflicts=True,
+        )
+        rebuild_daily_stats()
+        Project.touch(*[project.pk for project in self.projects])
+
+    def assertConstantQueries(self, user, request):
+        runs = []
+        for size in self.sizes:
+            self.grow_to(size)
+            clear_caches()
+            self.client.force_login(user)
+            with CaptureQueriesContext(connection) as ctx:
+                response = request()
+            self.assertLess(response.status_code, 400)
+            runs.append([query['sql'] for query in ctx.captured_queries])
+        self.assertEqual(len(runs[0]), len(runs[1]), '\n'.join(runs[1]))
+
+    def test_project_list(self):
+        self.assertConstantQueries(self.employee, lambda: self.client.get(reverse('projects:list')))
+
+    def test_project_list_for_director(self):
+        self.assertConstantQueries(self.director, lambda: self.client.get(reverse('projects:list')))
+
+    def test_project_list_keyset_page(self):
+        self.assertConstantQueries(self.director, lambda: self.client.get(reverse('projects:list'), {'cursor': ''}))
+
+    def test_kanban(self):
+        self.assertConstantQueries(self.employee, lambda: self.client.get(reverse('projects:kanban')))
+
+    def test_timeline(self):
+        self.assertConstantQueries(self.director, lambda: self.client.get(reverse('projects:timeline')))
+
+    def test_project_detail(self):
+        self.assertConstantQueries(
+            self.employee, lambda: self.client.get(reverse('projects:detail', args=[self.projects[0].pk]))
+        )
+
+    def test_project_dashboard(self):
+        self.assertConstantQueries(
+            self.employee, lambda: self.client.get(reverse('projects:project_dashboard', args=[self.projects[0].pk]))
+        )
+
+    def test_work_log_create(self):
+        def create():
+            # A project without a log for today, so the form is valid on every run
+            return self.client.post(
+                reverse('projects:add_work_log', args=[self.projects[-1].pk]),
+                {'date': timezone.now().date().isoformat(), 'description': 'Work', 'hours_worked': '4.0'},
+            )
+
+        self.assertConstantQueries(self.employee, create)
+
+
+class SeedPerfCommandTests(TestCase):
+    def test_seeds_consistent_data_at_small_scale(self):
+        call_command('seed_perf', users=5, projects=40, logs=300, chunk_size=25, stdout=StringIO())
+        users = User.objects.filter(username__startswith='perf-')
+        self.assertEqual(users.count(), 5)
+        self.assertTrue(users.filter(user_type='director').exists())
+        self.assertEqual(Project.objects.count(), 40)
+        self.assertFalse(Project.objects.filter(user__user_type='director').exists())
+        logs = WorkLog.objects.count()
+        self.assertTrue(0 < logs <= 300)
+        self.assertEqual(ProjectDailyStats.objects.aggregate(total=Sum('log_count'))['total'], logs)
+
+        # Time a seeded user logged on someone else's project goes too, rollup included
+        owner = User.objects.create_user('owner', password='pass')
+        project = make_project(owner)
+        WorkLog.objects.create(project=project, user=owner, date=timezone.now().date(),
+                               description='Own work', hours_worked=Decimal('2.0'))
+        WorkLog.objects.create(project=project, user=users.first(), date=timezone.now().date(),
+                               description='Seeded', hours_worked=Decimal('3.0'))
+
+        # A second run with --clear replaces the data set instead of adding to it
+        with mock.patch('projects.signals.apply_daily_stats_delta') as delta:
+            call_command('seed_perf', users=5, projects=10, logs=50, chunk_size=4, clear=True, stdout=StringIO())
+        delta.assert_not_called()
+        self.assertEqual(Project.objects.count(), 11)
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(list(project.daily_stats.values_list('user__username', 'hours')), [('owner', Decimal('2'))])
+        self.assertEqual(ProjectDailyStats.objects.aggregate(total=Sum('log_count'))['total'], WorkLog.objects.count())
+
+
+class AsyncViewTests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee)
+        WorkLog.objects.create(project=self.project, user=self.employee, date=timezone.now().date(),
+                               description='Work', hours_worked=Decimal('3.0'))
+
+    async def test_views_serve_async_requests(self):
+        await self.async_client.aforce_login(self.employee)
+        dashboard = await self.async_client.get(reverse('projects:project_dashboard', args=[self.project.pk]))
+        self.assertEqual(dashboard.status_code, 200)
+        self.assertEqual(dashboard.context['total_hours'], Decimal('3'))
+        timeline = await self.async_client.get(reverse('projects:timeline'))
+        self.assertEqual([project.pk for project in timeline.context['projects']], [self.project.pk])
+        stats = await self.async_client.get(reverse('projects:api_project_stats', args=[self.project.pk]))
+        self.assertEqual(stats.json()['active_days'], 1)
+
+    async def test_anonymous_requests_are_rejected(self):
+        response = await self.async_client.get(reverse('projects:project_dashboard', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 302)
+        response = await self.async_client.get(reverse('projects:api_project_stats', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 403)
+
+
+class RecordingBroker(BaseBroker):
+    """Local stand-in for the live-update pub/sub: keeps what was published."""
+
+    def __init__(self):
+        self.events = []
+
+    def publish(self, type, project_id, owner_id, data):
+        self.events.append((type, project_id, owner_id, data))
+
+
+@override_settings(PROJECT_EVENTS_BACKEND='projects.tests.RecordingBroker', LIVE_UPDATES_ENABLED=True)
+class LiveEventPublishingTests(TestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.project = make_project(self.employee)
+        self.broker = get_broker()
+        self.broker.events.clear()
+
+    def test_new_work_log_publishes_card_move_and_log_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log = WorkLog.objects.create(project=self.project, user=self.employee, date=timezone.now().date(),
+                                         description='Cabling', hours_worked=Decimal('2.0'))
+            self.assertEqual(self.broker.events, [])
+
+        (project_event, work_log_event) = self.broker.events
+        self.assertEqual(project_event[:3], ('project', self.project.pk, self.employee.pk))
+        self.assertEqual(project_event[3]['column'], 'in_progress')
+        self.assertEqual(work_log_event[:3], ('work_log', self.project.pk, self.employee.pk))
+        self.assertEqual(work_log_event[3]['id'], log.pk)
+        self.assertIn('Cabling', work_log_event[3]['html'])
+
+    def test_submitting_project_moves_card_to_completed(self):
+        self.project.is_submitted = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        self.assertEqual([(event[0], event[3]['column']) for event in self.broker.events],
+                         [('project', 'completed')])
+
+
+@override_settings(LIVE_UPDATES_ENABLED=True)
+class LiveEventStreamTests(TestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user('employee', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        self.project = make_project(self.employee)
+
+    async def test_stream_only_carries_visible_projects(self):
+        await self.async_client.aforce_login(self.employee)
+        response = await self.async_client.get(reverse('projects:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        broker = get_broker()
+        # Published from another thread, as the post-commit hooks of sync views are
+        await sync_to_async(broker.publish, thread_sensitive=False)('project', 999, self.other.pk, {'id': 999})
+        broker.publish('project', self.project.pk, self.employee.pk, {'id': self.project.pk})
+        chunk = (await anext(stream)).decode()
+        self.assertIn('event: project\n', chunk)
+        self.assertIn(f'data: {{"id":{self.project.pk}}}', chunk)
+        await stream.aclose()
+
+    @override_settings(PROJECT_EVENTS_HEARTBEAT=0)
+    async def test_idle_stream_sends_keep_alive(self):
+        await self.async_client.aforce_login(self.employee)
+        stream = aiter((await self.async_client.get(reverse('projects:events'))).streaming_content)
+        await anext(stream)
+        self.assertEqual(await anext(stream), b': keep-alive\n\n')
+        await stream.aclose()
+
+    async def test_project_filter_requires_a_visible_project(self):
+        await self.async_client.aforce_login(self.other)
+        response = await self.async_client.get(reverse('projects:events'), {'project': self.project.pk})
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream_is_refused_outside_asgi_or_when_disabled(self):
+        self.client.force_login(self.employee)
+        # WSGI would buffer the endless stream and pin the worker
+        self.assertEqual(self.client.get(reverse('projects:events')).status_code, 204)
+        self.assertIn(b'EventSource', self.client.get(reverse('projects:kanban')).content)
+        with self.settings(LIVE_UPDATES_ENABLED=False):
+            self.assertNotIn(b'EventSource', self.client.get(reverse('projects:kanban')).content)
+            self.assertNotIn(b'EventSource', self.client.get(reverse('projects:detail', args=[self.project.pk])).content)
+
+    async def test_disabled_stream_answers_no_content(self):
+        await self.async_client.aforce_login(self.employee)
+        with self.settings(LIVE_UPDATES_ENABLED=False):
+            response = await self.async_client.get(reverse('projects:events'))
+        self.assertEqual(response.status_code, 204)
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        broker = InProcessBroker()
+        broker.queue_size = 1
+        subscription = broker.subscribe()
+        broker.publish('project', 1, 1, {})
+        broker.publish('project', 2, 1, {})
+        await asyncio.sleep(0)
+        self.assertEqual((await subscription.get(timeout=1)).type, 'resync')
+        subscription.close()
+        self.assertFalse(broker.has_subscribers())
+
+
+class UserCacheTests(ColdCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.employee = User.objects.create_user('employee', password='pass')
+        make_project(self.employee)
+        self.client.force_login(self.director)
+
+    def user_queries(self, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('projects:list'), *args)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in ctx.captured_queries if 'FROM "users_user"' in query['sql']], response
+
+    def test_warm_list_page_does_not_query_users(self):
+        self.user_queries()
+        queries, response = self.user_queries({'user': self.employee.pk})
+        self.assertEqual(queries, [])
+        self.assertEqual(len(response.context['projects']), 1)
+        self.assertEqual([user.username for user in response.context['users']], ['director', 'employee'])
+
+    def test_saving_a_user_refreshes_role_and_list(self):
+        self.user_queries()
+        User.objects.create_user('newcomer', password='pass')
+        _, response = self.user_queries()
+        self.assertIn('newcomer', [user.username for user in response.context['users']])
+
+        self.director.user_type = 'employee'
+        self.director.save()
+        self.assertEqual(self.client.get(reverse('projects:metrics')).status_code, 403)
+
+    def test_sessions_from_the_plain_model_backend_stay_valid(self):
+        self.client.logout()
+        self.client.force_login(self.employee, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('projects:list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.employee)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        # There is no replica connection here; only the alias names are routed
+        patcher = mock.patch('projects.routers.replica_aliases', side_effect=lambda: settings.DATABASE_REPLICAS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def routed_view(self):
+        @read_from_replica
+        def view(request):
+            return HttpResponse(self.router.db_for_read(Project) or 'default')
+
+        return view
+
+    def test_read_only_requests_go_to_a_replica(self):
+        view = self.routed_view()
+        self.assertEqual(view(self.factory.get('/')).content, b'replica_1')
+        self.assertEqual(view(self.factory.post('/')).content, b'default')
+        # Outside the view, and for writes, nothing changes
+        self.assertIsNone(self.router.db_for_read(Project))
+        self.assertEqual(self.router.db_for_write(Project), 'default')
+        self.assertFalse(self.router.allow_migrate('replica_1', 'projects'))
+
+    def test_async_views_route_queries_run_in_worker_threads(self):
+        @read_from_replica
+        async def view(request):
+            return HttpResponse(await sync_to_async(self.router.db_for_read)(Project))
+
+        self.assertEqual(async_to_sync(view)(self.factory.get('/')).content, b'replica_1')
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        middleware = ReadYourWritesMiddleware(lambda request: HttpResponse())
+        self.assertNotIn(STICKY_COOKIE, middleware(self.factory.get('/')).cookies)
+        cookie = middleware(self.factory.post('/')).cookies[STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+
+        view = self.routed_view()
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = cookie.value
+        self.assertEqual(view(request).content, b'default')
+        request.COOKIES[STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(view(request).content, b'replica_1')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_nothing_is_routed(self):
+        self.assertEqual(self.routed_view()(self.factory.get('/')).content, b'default')
+        with self.assertRaises(MiddlewareNotUsed):
+            ReadYourWritesMiddleware(lambda request: HttpResponse())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The replica is a snapshot of the SQLite test database')
+class ReplicaReadTests(ColdCacheMixin, TransactionTestCase):
+    """Routed reads against a real second database that lags behind the primary."""
+
+    alias = 'replica_snapshot'
+
+    def setUp(self):
+        super().setUp()
+        self.director = User.objects.create_user('director', password='pass', user_type='director')
+        self.replicated = make_project(self.director, name='Replicated')
+        today = timezone.now().date()
+        for offset in (5, 0):
+            WorkLog.objects.create(project=self.replicated, user=self.director, date=today - timedelta(days=offset),
+                                   description='Work', hours_worked=Decimal('1.0'))
+        self.client.force_login(self.director)
+
+        # The replica is a copy taken now: later writes to the primary never reach it
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'replica.sqlite3')
+        connection.ensure_connection()
+        snapshot = sqlite3.connect(path)
+        connection.connection.backup(snapshot)
+        snapshot.close()
+        # A connection made here rather than in settings.DATABASES, so the test runner leaves it alone
+        replica = load_backend(connection.settings_dict['ENGINE']).DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': path}, self.alias
+        )
+        connections[self.alias] = replica
+        self.addCleanup(connections.__delitem__, self.alias)
+        self.addCleanup(replica.close)
+        self.enterContext(override_settings(DATABASE_REPLICAS=[self.alias]))
+
+        make_project(self.director, name='Primary only')
+        WorkLog.objects.create(project=self.replicated, user=self.director, date=today - timedelta(days=2),
+                               description='Work', hours_worked=Decimal('1.0'))
+
+    def project_names(self):
+        # A sync view: the connection above only exists in this thread
+        response = self.client.get(reverse('projects:list'))
+        self.assertEqual(response.status_code, 200)
+        return sorted(project.name for project in response.context['projects'])
+
+    def test_routed_reads_miss_unreplicated_rows_until_sticky(self):
+        self.assertEqual(self.project_names(), ['Replicated'])
+        self.client.cookies[STICKY_COOKIE] = f'{time.time() + 60:.0f}'
+        self.assertEqual(self.project_names(), ['Primary only', 'Replicated'])
+        # Once the deadline passes, reads go back to the lagging replica
+        self.client.cookies[STICKY_COOKIE] = f'{time.time() - 1:.0f}'
+        self.assertEqual(self.project_names(), ['Replicated'])
+
+    def test_dashboard_stats_all_come_from_the_replica(self):
+        stats = {}
+
+        @read_from_replica
+        def view(request):
+            stats.update(get_project_stats(self.replicated))
+            return HttpResponse()
+
+        view(RequestFactory().get('/'))
+        # The idle gaps agree with the totals: both miss the unreplicated log
+        self.assertEqual(stats['active_days'], 2)
+        self.assertEqual([gap['days'] for gap in stats['idle_days']], [4])
+        self.assertEqual([gap['days'] for gap in get_idle_gaps(self.replicated.pk)], [2, 1])
+
+
+@override_settings(PARALLEL_QUERIES=True)
+class ParallelQueryTests(TransactionTestCase):
+    """Outside a transaction the dashboard queries really run on separate connections."""
+
+    def test_callables_overlap_on_separate_threads(self):
+        def slow():
+            time.sleep(0.2)
+            return threading.get_ident()
+
+        start = time.perf_counter()
+        threads = async_to_sync(gather_queries)(slow, slow, slow)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(len(set(threads)), 3)
+
+    def test_parallel_stats_match_sequential_stats(self):
+        employee = User.objects.create_user('employee', password='pass')
+        project = make_project(employee)
+        today = timezone.now().date()
+        for offset in (0, 1, 5):
+            WorkLog.objects.create(project=project, user=employee, date=today - timedelta(days=offset),
+                                   description='Work', hours_worked=Decimal('2.5'))
+        self.assertEqual(async_to_sync(aget_project_stats)(project), get_project_stats(project))
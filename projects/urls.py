@@ -1,15 +1,18 @@
+import logging
+
 from django.urls import path
-from . import views
+from . import api, views, views_events
 # from .views_timeline import ProjectTimelineView
-from .views import SendFeedbackRequestView, ClientFeedbackTokenView, feedback_thank_you
+from .views import SendFeedbackRequestView, FeedbackCampaignView, ClientFeedbackTokenView, feedback_thank_you
 from .views import ProjectTimelineView, project_dashboard
 
 app_name = 'projects'
-print("DEBUG: Imported views:", ProjectTimelineView, project_dashboard)
+logger = logging.getLogger(__name__)
 urlpatterns = [
     path('', views.ProjectListView.as_view(), name='list'),
     path('kanban/', views.ProjectKanbanView.as_view(), name='kanban'),
     path('timeline/', ProjectTimelineView.as_view(), name='timeline'),
+    path('export/<str:fmt>/', views.ProjectExportView.as_view(), name='export'),
     path('<int:project_id>/dashboard/', project_dashboard, name='project_dashboard'),
     path('create/', views.ProjectCreateView.as_view(), name='create'),
     path('<int:pk>/', views.ProjectDetailView.as_view(), name='detail'),
@@ -19,12 +22,24 @@ urlpatterns = [
     path('submit/<int:pk>/', views.submit_project, name='submit_project'),
     # Work Log URLs
     path('<int:project_pk>/work-log/add/', views.WorkLogCreateView.as_view(), name='add_work_log'),
+    path('work-logs/import/', views.WorkLogImportView.as_view(), name='import_work_logs'),
+    path('<int:pk>/work-logs/export/<str:fmt>/', views.WorkLogExportView.as_view(), name='export_work_logs'),
     path('<int:pk>/send-feedback/', SendFeedbackRequestView.as_view(), name='send_feedback'),
+    path('feedback/campaign/', FeedbackCampaignView.as_view(), name='feedback_campaign'),
     # path('<int:pk>/client-feedback/', ClientFeedbackView.as_view(), name='client_feedback'),
     path('client-feedback/<uuid:token>/', ClientFeedbackTokenView.as_view(),
          name='client_feedback_token'),
     path('feedback/thank-you/', feedback_thank_you, name='feedback_thank_you'),
+    # Read-only JSON API
+    path('api/projects/', api.ProjectListAPIView.as_view(), name='api_projects'),
+    path('api/projects/<int:pk>/', api.ProjectDetailAPIView.as_view(), name='api_project'),
+    path('api/projects/<int:pk>/work-logs/', api.WorkLogListAPIView.as_view(), name='api_work_logs'),
+    path('api/projects/<int:pk>/stats/', api.ProjectStatsAPIView.as_view(), name='api_project_stats'),
+    # Server-sent events for live kanban/work-log updates
+    path('events/', views_events.project_events, name='events'),
+    # Prometheus scrape target (director only)
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
 
 ]
 
-print("DEBUG: URL patterns loaded:", urlpatterns)
\ No newline at end of file
+logger.debug("projects URL patterns loaded: %d routes", len(urlpatterns))
\ No newline at end of file
@@ -1,30 +1,46 @@
+import io
+import logging
+
+from asgiref.sync import sync_to_async
 from django.views.generic import ListView, CreateView, UpdateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.shortcuts import redirect, get_object_or_404
-from django.db.models import Q
+from django.db.models import Count, Max, Q, Sum
 from django.utils import timezone
-from django.http import JsonResponse
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, JsonResponse
 from django.template.loader import render_to_string
+from django.views import View
+from django.utils.decorators import method_decorator
 from .views_kanban import ProjectKanbanView, update_project_status
+from . import metrics
+from .cache import acached_project_stats, attach_fragments
+from .conditional import project_condition
+from .routers import read_from_replica
+from .imports import CONFLICT_MODES, IMPORT_FORMATS, READ_ERRORS, WorkLogImporter, describe_read_error
+from .exports import EXPORT_FORMATS, PROJECT_EXPORT_FIELDS, WORK_LOG_EXPORT_FIELDS, export_response
 from .models import Project, WorkLog
 from .forms import ProjectForm, ProjectFilterForm, WorkLogForm
 from .filters import ProjectFilter
+from .pagination import keyset_page
+from .search import search_projects, similar_values
+from users.cache import cached_user_list
+
+logger = logging.getLogger(__name__)
 
-from django.contrib.auth import get_user_model
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from .models import Project
 from .filters import ProjectFilter, ProjectFilterForm
 
-User = get_user_model()
-
 
 
 
 
 
+@method_decorator(read_from_replica, name='dispatch')
 class ProjectListView(LoginRequiredMixin, ListView):
     model = Project
     template_name = 'projects/project_list.html'
@@ -33,16 +49,41 @@ class ProjectListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         queryset = Project.objects.all() if self.request.user.is_director() else Project.objects.filter(user=self.request.user)
+        self.scoped_queryset = queryset
+        queryset = queryset.select_related('user').annotate(
+            log_count=Count('work_logs'),
+            total_hours=Sum('work_logs__hours_worked'),
+            last_log_date=Max('work_logs__date'),
+        ).order_by('-created_at', '-id')
         self.filterset = ProjectFilter(self.request.GET, queryset=queryset)
         return self.filterset.qs
 
+    def is_keyset_mode(self):
+        return 'cursor' in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        # ?cursor= switches to keyset pagination on (created_at, id)
+        if not self.is_keyset_mode():
+            return super().paginate_queryset(queryset, page_size)
+        rows, self.next_cursor = keyset_page(queryset, self.request.GET.get('cursor'), page_size)
+        return (None, None, rows, self.next_cursor is not None)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['filter'] = self.filterset
         context['filter_form'] = ProjectFilterForm(self.request.GET)
+        context['projects'] = attach_fragments(context['projects'], 'projects/project_list_row.html', self.request.user)
+        if self.is_keyset_mode():
+            context['next_cursor'] = self.next_cursor
+        # "Did you mean" for company/category filters that matched nothing
+        if not context['projects']:
+            context['suggestions'] = {
+                field: similar_values(self.scoped_queryset, field, self.request.GET[field])
+                for field in ('company', 'category') if self.request.GET.get(field)
+            }
         # include users list for director filter dropdown
         if self.request.user.is_director():
-            context['users'] = User.objects.all()
+            context['users'] = cached_user_list()
         return context
 
 
@@ -50,18 +91,20 @@ import django_filters
 from .models import Project
 
 class ProjectFilter(django_filters.FilterSet):
+    search = django_filters.CharFilter(method='filter_search', label='Search')
     name = django_filters.CharFilter(field_name='name', lookup_expr='icontains', label='Project Name')
-    user = django_filters.ModelChoiceFilter(queryset=None, label='User')
+    company = django_filters.CharFilter(lookup_expr='icontains')
+    category = django_filters.CharFilter(lookup_expr='icontains')
+    # Filters on the id directly, so ?user= costs no lookup of the user row
+    user = django_filters.NumberFilter(field_name='user', label='User')
 
     class Meta:
         model = Project
-        fields = ['name', 'user']
+        fields = ['search', 'name', 'company', 'category', 'user']
+
+    def filter_search(self, queryset, name, value):
+        return search_projects(queryset, value)
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Dynamically set user queryset for filter
-        from django.contrib.auth import get_user_model
-        self.filters['user'].queryset = get_user_model().objects.all()
 
     
 
@@ -132,16 +175,15 @@ class ProjectUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return reverse_lazy('projects:detail', kwargs={'pk': self.object.pk})
 
 
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(project_condition, name='dispatch')
 class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     model = Project
     template_name = 'projects/project_detail.html'
     context_object_name = 'project'
 
     def dispatch(self, request, *args, **kwargs):
-        print("\n=== ProjectDetailView.dispatch ===")
-        print(f"Request method: {request.method}")
-        print(f"Request path: {request.path}")
-        print(f"User: {request.user}")
+        logger.debug("ProjectDetailView.dispatch %s %s user=%s", request.method, request.path, request.user)
         return super().dispatch(request, *args, **kwargs)
 
     def test_func(self):
@@ -149,11 +191,9 @@ class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         return self.request.user.is_director() or self.request.user == project.user
 
     def get_context_data(self, **kwargs):
-        print("\n=== ProjectDetailView.get_context_data ===")
         context = super().get_context_data(**kwargs)
         project = self.get_object()
-        print(f"Project: {project}")
-        print(f"User: {self.request.user}")
+        logger.debug("ProjectDetailView.get_context_data project=%s user=%s", project.pk, self.request.user)
         
         context.update({
             'work_logs': project.work_logs.select_related('user').order_by('-date', '-created_at'),
@@ -175,7 +215,6 @@ class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             project=project,
             user=self.request.user
         )
-        print("Work log form created successfully")
         
         context.update({
             'work_logs': project.work_logs.select_related('user').order_by('-date', '-created_at'),
@@ -183,7 +222,7 @@ class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             'debug': True
         })
         
-        print("\nContext keys:", list(context.keys()))
+        logger.debug("ProjectDetailView context keys: %s", list(context))
         return context
 
     def post(self, request, *args, **kwargs):
@@ -252,8 +291,7 @@ class WorkLogCreateView(LoginRequiredMixin, CreateView):
 
 
     def form_invalid(self, form):
-        print("\n=== WorkLogCreateView.form_invalid ===")
-        print(f"Form errors: {form.errors}")
+        logger.info("Work log rejected for project %s: %s", self.kwargs.get('project_pk'), form.errors.as_json())
         if self.is_ajax():
             error_data = {field: errors[0] for field, errors in form.errors.items()}
             # Check for unique constraint violation
@@ -262,7 +300,6 @@ class WorkLogCreateView(LoginRequiredMixin, CreateView):
             else:
                 status_code = 400  # Bad Request
                 
-            print(f"Returning JSON error response: {error_data}")
             return JsonResponse({
                 'status': 'error',
                 'error': error_data
@@ -276,6 +313,67 @@ class WorkLogCreateView(LoginRequiredMixin, CreateView):
 
 
 
+class WorkLogImportView(LoginRequiredMixin, View):
+    """Upload a CSV/JSONL file of work logs; responds with a summary and per-row errors."""
+    max_reported_errors = 1000
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return JsonResponse({'status': 'error', 'message': 'No file uploaded.'}, status=400)
+        fmt = request.POST.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if fmt not in IMPORT_FORMATS:
+            return JsonResponse({'status': 'error', 'message': 'Upload a .csv or .jsonl file.'}, status=400)
+        on_conflict = request.POST.get('on_conflict', 'skip')
+        if on_conflict not in CONFLICT_MODES:
+            return JsonResponse({'status': 'error', 'message': 'on_conflict must be "skip" or "update".'}, status=400)
+
+        errors = []
+
+        def collect(line, row_errors):
+            if len(errors) < self.max_reported_errors:
+                errors.append({'line': line, 'errors': row_errors})
+
+        importer = WorkLogImporter(
+            default_user=request.user,
+            restrict_to_user=request.user,
+            on_conflict=on_conflict,
+            on_error=collect,
+        )
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        try:
+            summary = importer.run(stream, fmt)
+        except READ_ERRORS as exc:
+            # Rows before the unreadable part are already imported; say how many
+            return JsonResponse({'status': 'error', 'message': describe_read_error(exc),
+                                 'summary': importer.summary, 'errors': errors}, status=400)
+        return JsonResponse({'status': 'success', 'summary': summary, 'errors': errors})
+
+
+class ProjectExportView(LoginRequiredMixin, View):
+    """Stream the (filtered) project list as CSV or XLSX."""
+
+    def get(self, request, fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise Http404("Unsupported export format")
+        queryset = Project.objects.all() if request.user.is_director() else Project.objects.filter(user=request.user)
+        queryset = ProjectFilter(request.GET, queryset=queryset).qs
+        return export_response(request, queryset, PROJECT_EXPORT_FIELDS, fmt, 'projects')
+
+
+class WorkLogExportView(LoginRequiredMixin, View):
+    """Stream one project's work logs as CSV or XLSX."""
+
+    def get(self, request, pk, fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise Http404("Unsupported export format")
+        project = get_object_or_404(Project.objects.only('id', 'user_id'), pk=pk)
+        if not (request.user.is_director() or request.user.pk == project.user_id):
+            raise PermissionDenied
+        queryset = WorkLog.objects.filter(project=project).order_by('-date', '-created_at')
+        return export_response(request, queryset, WORK_LOG_EXPORT_FIELDS, fmt, f'project-{project.pk}-work-logs')
+
+
 class ProjectSubmitView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Project
     fields = []  # No fields to edit, just updating is_submitted
@@ -342,7 +440,15 @@ from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+import json
+
+from django.db import transaction
+
+from .campaigns import run_feedback_campaign
 from .models import FeedbackToken
+from .outbox import queue_email
+from .streaming import streaming_response
+
 
 class SendFeedbackRequestView(LoginRequiredMixin, View):
     def post(self, request, pk):
@@ -350,22 +456,60 @@ class SendFeedbackRequestView(LoginRequiredMixin, View):
         if not project.client_email:
             return JsonResponse({'status': 'error', 'message': 'Client email not set.'}, status=400)
 
-        # Create a one-time token
-        fb_token = FeedbackToken.objects.create(project=project)
+        # Token and queued email commit together; the send_outbox worker delivers it
+        with transaction.atomic():
+            fb_token = FeedbackToken.objects.create(project=project)
 
-        feedback_url = request.build_absolute_uri(
-            reverse('projects:client_feedback_token', args=[str(fb_token.token)])
-        )
+            feedback_url = request.build_absolute_uri(
+                reverse('projects:client_feedback_token', args=[str(fb_token.token)])
+            )
 
-        send_mail(
-            subject=f"Feedback request for project: {project.name}",
-            message=f"Please provide feedback here: {feedback_url}",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[project.client_email],
-            fail_silently=False,
+            queue_email(
+                subject=f"Feedback request for project: {project.name}",
+                body=f"Please provide feedback here: {feedback_url}",
+                to=project.client_email,
+            )
+
+        return JsonResponse({'status': 'success', 'message': 'Feedback request queued for the client.'})
+
+
+class FeedbackCampaignView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Director-only: queue feedback requests for the given submitted projects, streaming progress as JSON lines."""
+    chunk_size = 100
+
+    def test_func(self):
+        return self.request.user.is_director()
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body or '{}')
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON body.'}, status=400)
+
+        project_ids = data.get('project_ids') if isinstance(data, dict) else None
+        if (not isinstance(project_ids, list) or not project_ids
+                or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in project_ids)):
+            return JsonResponse({'status': 'error', 'message': 'project_ids must be a non-empty list of IDs.'},
+                                status=400)
+        projects = Project.objects.filter(pk__in=project_ids)
+
+        progress = run_feedback_campaign(projects, request, chunk_size=self.chunk_size)
+        return streaming_response(
+            request,
+            (json.dumps(step) + '\n' for step in progress),
+            content_type='application/x-ndjson',
         )
 
-        return JsonResponse({'status': 'success', 'message': 'Feedback request sent to client.'})
+
+class MetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Director-only: request histograms and cache counters in Prometheus text format."""
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_director()
+
+    def get(self, request):
+        return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 
@@ -397,19 +541,27 @@ class ClientFeedbackTokenView(UpdateView):
     context_object_name = "project"
 
     def dispatch(self, request, *args, **kwargs):
-        self.token_obj = get_object_or_404(FeedbackToken, token=kwargs['token'])
-        if self.token_obj.used:
-            messages.error(request, "This feedback link has already been used.")
-            return render(request, "projects/feedback_expired.html")
+        # Token and project in one query; get_object() reuses the project
+        self.token_obj = get_object_or_404(FeedbackToken.objects.select_related('project'), token=kwargs['token'])
+        if not self.token_obj.is_usable():
+            return self.link_expired()
         return super().dispatch(request, *args, **kwargs)
 
     def get_object(self, queryset=None):
         return self.token_obj.project
 
+    def link_expired(self):
+        messages.error(self.request, "This feedback link has already been used or has expired.")
+        return render(self.request, "projects/feedback_expired.html")
+
     def form_valid(self, form):
+        with transaction.atomic():
+            # The conditional UPDATE settles concurrent submits: only one saves feedback
+            if not self.token_obj.consume():
+                return self.link_expired()
+            response = super().form_valid(form)
         messages.success(self.request, "Thank you for your feedback!")
-        self.token_obj.mark_used()
-        return super().form_valid(form)
+        return response
 
     def get_success_url(self):
         return reverse('projects:feedback_thank_you')
@@ -422,89 +574,66 @@ def feedback_thank_you(request):
 
 
 # views.py
-from django.shortcuts import render, get_object_or_404
-from django.views.generic import ListView
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum
+from django.shortcuts import render, aget_object_or_404
+from django.db.models import Count, DateField, DecimalField, DurationField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import timedelta
 from .models import Project, WorkLog
 
 
 # --- Timeline View (All Projects) ---
-class ProjectTimelineView(LoginRequiredMixin, ListView):
-    model = Project
+@method_decorator(read_from_replica, name='get')
+@method_decorator(login_required, name='get')
+class ProjectTimelineView(View):
+    """Async: the rows are fetched with the async ORM and the template is rendered in a worker thread."""
     template_name = 'projects/timeline.html'
-    context_object_name = 'projects'
 
-    def get_queryset(self):
-        if hasattr(self.request.user, 'is_director') and self.request.user.is_director():
+    def get_queryset(self, user):
+        if user.is_director():
             queryset = Project.objects.all()
         else:
-            queryset = Project.objects.filter(user=self.request.user)
-        return queryset.order_by('created_at')
+            queryset = Project.objects.filter(user=user)
+
+        # Effort stats and remaining time are computed in the same query as the projects
+        today = timezone.now().date()
+        return queryset.annotate(
+            total_hours=Coalesce(
+                Sum('work_logs__hours_worked'),
+                Value(0),
+                output_field=DecimalField(max_digits=12, decimal_places=1),
+            ),
+            active_days=Count('work_logs__date', distinct=True),
+            time_left=ExpressionWrapper(
+                F('completion_date') - Value(today, output_field=DateField()),
+                output_field=DurationField(),
+            ),
+        ).order_by('created_at')
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        projects = self.get_queryset()
+    async def get(self, request):
+        user = await request.auser()
+        projects = [project async for project in self.get_queryset(user)]
 
-        # Calculate total effort for each project
+        # Days left until completion (already evaluated rows, no extra queries)
         for project in projects:
-            total_hours = project.work_logs.aggregate(total=Sum('hours_worked'))['total'] or 0
-            project.total_hours = total_hours
-
-            # Active days
-            active_days = project.work_logs.values('date').distinct().count()
-            project.active_days = active_days
+            project.days_left = project.time_left.days if project.time_left is not None else None
 
-            # Days left until completion
-            project.days_left = (project.completion_date - timezone.now().date()).days if project.completion_date else None
-
-        context['today'] = timezone.now().date()
-        return context
+        context = {
+            'projects': projects,
+            'object_list': projects,
+            'today': timezone.now().date(),
+            'view': self,
+        }
+        return await sync_to_async(render)(request, self.template_name, context)
 
 
 # --- Dashboard View (Single Project) ---
-def project_dashboard(request, project_id):
-    print("DEBUG: project_dashboard called with project_id =", project_id)
-    project = get_object_or_404(Project, id=project_id)
-
-    logs = WorkLog.objects.filter(project=project)
-
-    total_hours = logs.aggregate(total=Sum('hours_worked'))['total'] or 0
-    active_days = logs.values('date').distinct().count()
-    avg_daily_hours = (total_hours / active_days) if active_days else 0
-
-    workload_by_user = logs.values('user__username').annotate(total=Sum('hours_worked'))
-    daily_trend = logs.values('date').annotate(total=Sum('hours_worked')).order_by('date')
-
-    cumulative = []
-    running_total = 0
-    for d in daily_trend:
-        running_total += float(d['total'])
-        cumulative.append({'date': d['date'], 'cumulative': running_total})
-
-    idle_days = []
-    if logs.exists():
-        dates = sorted(set([l.date for l in logs]))
-        for i in range(1, len(dates)):
-            gap = (dates[i] - dates[i-1]).days - 1
-            if gap > 0:
-                idle_days.append({'from': dates[i-1] + timedelta(days=1),
-                                  'to': dates[i] - timedelta(days=1),
-                                  'days': gap})
-
-    days_left = (project.completion_date - timezone.now().date()).days if project.completion_date else None
-
-    context = {
-        "project": project,
-        "total_hours": total_hours,
-        "avg_daily_hours": round(avg_daily_hours, 1),
-        "active_days": active_days,
-        "days_left": days_left,
-        "workload_by_user": list(workload_by_user),
-        "daily_trend": list(daily_trend),
-        "cumulative": cumulative,
-        "idle_days": idle_days,
-    }
-    return render(request, "projects/dashboard.html", context)
+@read_from_replica
+@login_required
+@project_condition
+async def project_dashboard(request, project_id):
+    logger.debug("project_dashboard project=%s", project_id)
+    project = await aget_object_or_404(Project, id=project_id)
+
+    context = {"project": project}
+    context.update(await acached_project_stats(project))
+    return await sync_to_async(render)(request, "projects/dashboard.html", context)
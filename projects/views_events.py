@@ -0,0 +1,79 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .api import visible_projects
+from .events import RESYNC, get_broker
+
+# Browsers wait this long before reconnecting a dropped stream
+RETRY_MS = 5000
+
+
+def format_event(event):
+    lines = [f'event: {event.type}']
+    if event.id is not None:
+        lines.append(f'id: {event.id}')
+    lines.append(f'data: {json.dumps(event.data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(broker, user_id, is_director, project_id=None):
+    """
+    Yield server-sent events for the projects the user can see.
+
+    Subscribing happens on first iteration, inside the event loop that serves
+    the response; the subscription is dropped when the client disconnects and
+    the server cancels the generator.
+    """
+    subscription = broker.subscribe()
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        while True:
+            try:
+                event = await subscription.get(timeout=settings.PROJECT_EVENTS_HEARTBEAT)
+            except TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+                continue
+            if event.type != RESYNC:
+                if project_id is not None and event.project_id != project_id:
+                    continue
+                if not is_director and event.owner_id != user_id:
+                    continue
+            yield format_event(event)
+    finally:
+        subscription.close()
+
+
+@require_GET
+@login_required
+async def project_events(request):
+    """
+    Stream project status changes and new work logs as ``text/event-stream``.
+
+    ``?project=<id>`` narrows the stream to one project. ASGI only: a WSGI
+    server would buffer the endless stream and never send a byte, so unless
+    LIVE_UPDATES_ENABLED is on and the request came through ASGI the answer
+    is 204, which tells EventSource not to reconnect.
+    """
+    if not settings.LIVE_UPDATES_ENABLED or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    project_id = request.GET.get('project')
+    if project_id is not None:
+        if not project_id.isdigit() or not await visible_projects(user).filter(pk=project_id).aexists():
+            raise Http404('Project not found')
+        project_id = int(project_id)
+
+    response = StreamingHttpResponse(
+        event_stream(get_broker(), user.pk, user.is_director(), project_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,20 +1,103 @@
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Case, CharField, Count, Exists, OuterRef, Q, Value, When
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from .models import Project
+from django.utils.decorators import method_decorator
+from .cache import attach_fragments
+from .models import Project, WorkLog
+from .routers import read_from_replica
 import json
 
+# (key, title, icon) for each board column, in display order
+KANBAN_COLUMNS = (
+    ('not_started', 'Not Started', 'fas fa-clock text-warning'),
+    ('in_progress', 'In Progress', 'fas fa-sync text-primary'),
+    ('completed', 'Completed', 'fas fa-check text-success'),
+)
+
+
+@method_decorator(read_from_replica, name='dispatch')
 class ProjectKanbanView(LoginRequiredMixin, ListView):
     model = Project
     template_name = 'projects/kanban.html'
     context_object_name = 'projects'
+    cards_per_column = 20
 
     def get_queryset(self):
         if self.request.user.is_director():
-            return Project.objects.all()
-        return Project.objects.filter(user=self.request.user)
+            queryset = Project.objects.all()
+        else:
+            queryset = Project.objects.filter(user=self.request.user)
+
+        # Resolve each project's column in the database instead of per-card lookups
+        return queryset.annotate(
+            has_work_logs=Exists(WorkLog.objects.filter(project=OuterRef('pk'))),
+            kanban_column=Case(
+                When(is_submitted=True, then=Value('completed')),
+                When(has_work_logs=True, then=Value('in_progress')),
+                default=Value('not_started'),
+                output_field=CharField(),
+            ),
+        ).order_by('-created_at', '-id')
+
+    def is_ajax(self):
+        return self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+    def get_page_number(self):
+        try:
+            return max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            return 1
+
+    def get_column_page(self, queryset, column, page):
+        """Fetch one page of cards for a column, reading one extra row to detect a next page."""
+        size = self.cards_per_column
+        offset = (page - 1) * size
+        cards = list(queryset.filter(kanban_column=column)[offset:offset + size + 1])
+        return {
+            'key': column,
+            'cards': cards[:size],
+            'has_next': len(cards) > size,
+            'next_page': page + 1,
+        }
+
+    def get(self, request, *args, **kwargs):
+        column = request.GET.get('column')
+        if column and self.is_ajax():
+            if column not in dict((key, title) for key, title, icon in KANBAN_COLUMNS):
+                return JsonResponse({'status': 'error', 'message': 'Unknown column'}, status=400)
+            page = self.get_column_page(self.get_queryset(), column, self.get_page_number())
+            attach_fragments(page['cards'], 'projects/kanban_card.html', request.user)
+            html = render_to_string(
+                'projects/kanban_column_cards.html',
+                {'column': page},
+                request=request
+            )
+            return JsonResponse({'status': 'success', 'html': html, 'has_next': page['has_next']})
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        queryset = self.object_list
+
+        # Per-column totals from a single conditional aggregate
+        counts = queryset.order_by().aggregate(**{
+            key: Count('pk', filter=Q(kanban_column=key)) for key, title, icon in KANBAN_COLUMNS
+        })
+
+        columns = []
+        for key, title, icon in KANBAN_COLUMNS:
+            column = self.get_column_page(queryset, key, 1)
+            column.update({'title': title, 'icon': icon, 'count': counts[key]})
+            columns.append(column)
+        # One cache round trip for every card on the board
+        attach_fragments([card for column in columns for card in column['cards']],
+                         'projects/kanban_card.html', self.request.user)
+        context['columns'] = columns
+        return context
 
 @login_required
 @require_http_methods(["POST"])
@@ -0,0 +1,10 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that serves the per-request session user from the cache."""
+
+    def get_user(self, user_id):
+        return cached_user(user_id, super().get_user)
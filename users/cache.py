@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+USER_LIST_VERSION_KEY = 'user-list:version'
+
+
+def user_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def cached_user(user_id, load):
+    """
+    The user for ``user_id``, from the cache or else ``load(user_id)``.
+
+    Auth resolves the session's user on every request; caching the row (id,
+    username, role, password hash for the session check) saves that query.
+    """
+    key = user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = load(user_id)
+        if user is not None:
+            cache.set(key, user, settings.USER_CACHE_TTL)
+    return user
+
+
+def user_list_version():
+    version = cache.get(USER_LIST_VERSION_KEY)
+    if version is None:
+        # A fresh timestamp, so lists cached under an evicted version never come back
+        cache.add(USER_LIST_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(USER_LIST_VERSION_KEY)
+    return version
+
+
+def cached_user_list():
+    """Every user (id and name fields only), for the directors' filter dropdown."""
+    key = f'user-list:{user_list_version()}'
+    users = cache.get(key)
+    if users is None:
+        users = list(get_user_model().objects.only('id', 'username', 'first_name', 'last_name').order_by('pk'))
+        cache.set(key, users, settings.USER_CACHE_TTL)
+    return users
+
+
+def invalidate_user_list():
+    cache.set(USER_LIST_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_user(user_id):
+    cache.delete(user_key(user_id))
+    invalidate_user_list()